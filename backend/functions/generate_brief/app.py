@@ -1,4 +1,6 @@
 import json
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
 from shared import DynamoDBClient, S3Client, BedrockClient, AuditLogger, step_function_response
 
 db = DynamoDBClient()
@@ -7,6 +9,136 @@ bedrock = BedrockClient()
 audit = AuditLogger()
 
 
+# Stage outputs double as checkpoints: a retried task skips stages whose artifact is stored and valid.
+STAGE_ARTIFACTS = {
+    "profile": (
+        "briefs/{session_id}/v1/company_profile.json",
+        lambda d: isinstance(d, dict) and bool(d.get("companyOverview")),
+    ),
+    "questions": (
+        "briefs/{session_id}/v1/questions.json",
+        lambda d: isinstance(d, dict) and bool(d.get("questions")),
+    ),
+    "brief": (
+        "briefs/{session_id}/v1/interviewer_brief.json",
+        lambda d: isinstance(d, dict) and bool(d.get("page1_companyContext")),
+    ),
+    "packet": (
+        "packets/{session_id}/interviewee_packet.json",
+        lambda d: isinstance(d, dict) and bool(d.get("questionMenu")),
+    ),
+}
+
+
+def artifact_key(name, session_id):
+    return STAGE_ARTIFACTS[name][0].format(session_id=session_id)
+
+
+def load_checkpoint(key, is_valid):
+    try:
+        data = s3.get_json(key)
+    except Exception:
+        return None
+    return data if is_valid(data) else None
+
+
+def checkpointed(name, session_id, produce, reuse, reused):
+    """Wrap a stage so its artifact is stored as soon as it is produced.
+
+    With reuse, a valid stored artifact is returned instead of running the stage
+    (and name is appended to reused), unless one of the stage's inputs was
+    freshly produced in this run and the stored artifact may be out of date.
+    """
+    key = artifact_key(name, session_id)
+    is_valid = STAGE_ARTIFACTS[name][1]
+
+    def run(inputs):
+        if reuse and all(dep in reused for dep in inputs):
+            data = load_checkpoint(key, is_valid)
+            if data is not None:
+                print(f"Reusing {name} checkpoint {key}")
+                reused.append(name)
+                return data
+        data = produce(inputs)
+        s3.upload_json(key, data)
+        return data
+
+    return run
+
+
+PACKET_QUESTION_COUNT = 6  # the first 5-6 questions are the interviewee question menu
+
+
+def repair_questions(session_id, company_name, failing_ids, issues):
+    """Rewrite only the failing questions inside the stored questions checkpoint.
+
+    Returns the stages that must be re-rendered because of the rewrite, or None
+    when there is nothing to target (no checkpoint, or no stored question fails)
+    and the questions stage has to be regenerated as a whole.
+    """
+    key = artifact_key("questions", session_id)
+    stored = load_checkpoint(key, STAGE_ARTIFACTS["questions"][1])
+    if stored is None or load_checkpoint(artifact_key("profile", session_id), STAGE_ARTIFACTS["profile"][1]) is None:
+        return None
+    questions = stored["questions"]
+    failing_ids = set(failing_ids)
+    failing = [q for q in questions if q.get("id") in failing_ids]
+    if not failing:
+        return None
+
+    rewritten = bedrock.repair_questions(company_name, failing, issues).get("intervieweeQuestions", [])
+    by_id = {q["id"]: q for q in rewritten if isinstance(q, dict) and q.get("id") in failing_ids}
+    repaired = [by_id.get(q.get("id"), q) for q in questions]
+    changed = [i for i, (old, new) in enumerate(zip(questions, repaired)) if old != new]
+    print(f"Repaired {len(by_id)}/{len(failing)} failing questions, {len(changed)} changed")
+    if not changed:
+        return set()
+
+    s3.upload_json(key, {"questions": repaired})
+    stale = {"brief"}
+    if min(changed) < PACKET_QUESTION_COUNT:
+        stale.add("packet")
+    return stale
+
+
+def _timed(fn, inputs):
+    started = time.monotonic()
+    result = fn(inputs)
+    return result, int((time.monotonic() - started) * 1000)
+
+
+def run_stages(stages, max_workers=4):
+    """Run stages as a dependency DAG, each as soon as its inputs are ready.
+
+    stages maps name -> (dependency names, fn); fn receives a dict of the results
+    it depends on. Returns (results, per-stage wall time in ms). A failing stage
+    re-raises once the stages already running have finished.
+    """
+    for name, (deps, _) in stages.items():
+        missing = [d for d in deps if d not in stages]
+        if missing:
+            raise ValueError(f"Stage {name} depends on unknown stages {missing}")
+
+    results = {}
+    timings = {}
+    pending = dict(stages)
+    running = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while pending or running:
+            for name, (deps, fn) in list(pending.items()):
+                if all(d in results for d in deps):
+                    del pending[name]
+                    inputs = {d: results[d] for d in deps}
+                    running[executor.submit(_timed, fn, inputs)] = name
+            if not running:
+                raise ValueError(f"Stages {list(pending)} have circular dependencies")
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                results[name], timings[name] = future.result()
+    return results, timings
+
+
 def handler(event, context):
     try:
         session_id = event["sessionId"]
@@ -14,14 +146,25 @@ def handler(event, context):
         user_id = event.get("userId", "system")
         is_regen = event.get("isRegeneration", False)
         quality_feedback = event.get("qualityFeedback", [])
+        failing_ids = event.get("failingQuestionIds")
+        set_issues = event.get("setLevelIssues", [])
+        # A regeneration must not be served the completions that just failed quality checks,
+        # and runs every stage on the strong model instead of the routed fast one
+        bedrock.bypass_cache = is_regen
+        bedrock.prefer_strong = is_regen
+        bedrock.start_session(session_id, context)
 
         ingestion = event.get("ingestionResult", {})
-        chunks = ingestion.get("chunks", [])
-        entities = ingestion.get("entities", [])
+        llm_context = s3.load_payload(ingestion["contextRef"]) if "contextRef" in ingestion else ingestion
+        chunks = llm_context.get("chunks", [])
+        entities = llm_context.get("entities", [])
         sources = ingestion.get("sources", [])
         urls = event.get("urls", [])
 
-        context_chunks = chunks.copy()
+        context_chunks = [
+            f"[Source: {c['source']}]\n{c['text']}" if isinstance(c, dict) else c
+            for c in chunks
+        ]
         if entities:
             entity_text = "Key entities identified: " + ", ".join(
                 [f"{e['text']} ({e['type']})" for e in entities[:15]]
@@ -32,25 +175,73 @@ def handler(event, context):
             feedback_text = "QUALITY FEEDBACK FROM PRIOR GENERATION (fix these issues): " + "; ".join(quality_feedback)
             context_chunks.insert(0, feedback_text)
 
-        profile = bedrock.generate_company_profile(company_name, context_chunks, urls)
-        archetype = profile.get("industryClassification", {}).get("archetype", "service")
-        questions_data = bedrock.generate_questions(company_name, profile, archetype)
-        questions = questions_data.get("intervieweeQuestions", [])
+        def archetype_of(profile):
+            return profile.get("industryClassification", {}).get("archetype", "service")
+
+        partial_brief = {}
+        partial_key = f"briefs/{session_id}/v1/interviewer_brief.partial.json"
+
+        def persist_brief_section(key, value):
+            # get_session serves this while the full brief is still streaming
+            partial_brief[key] = value
+            s3.upload_json(partial_key, partial_brief)
+
         # Plan: packet shows only 5-6 (menu for interviewee to select 2-3); brief shows all 8 with selected first, then additional (incl. interviewer-only).
-        packet_questions = questions[:6]  # first 5-6 are the interviewee question menu
+        # Brief and packet depend only on profile and questions, so they run concurrently.
+        stage_fns = {
+            "profile": lambda r: bedrock.generate_company_profile(company_name, context_chunks, urls),
+            "questions": lambda r: {"questions": bedrock.generate_questions(
+                company_name, r["profile"], archetype_of(r["profile"]), quality_feedback
+            ).get("intervieweeQuestions", [])},
+            "brief": lambda r: bedrock.generate_interviewer_brief(
+                company_name, r["profile"], r["questions"]["questions"], on_section=persist_brief_section
+            ),
+            "packet": lambda r: bedrock.generate_interviewee_packet(
+                company_name, r["profile"], r["questions"]["questions"][:PACKET_QUESTION_COUNT]
+            ),
+        }
+        dependencies = {
+            "profile": (),
+            "questions": ("profile",),
+            "brief": ("profile", "questions"),
+            "packet": ("profile", "questions"),
+        }
+        # A retry reuses every stored stage. A quality regeneration with only per-question
+        # failures rewrites just those questions and re-renders only what shows them; set-level
+        # failures (count, phases) regenerate the questions, and everything after, on the stored profile.
+        reuse = set(STAGE_ARTIFACTS)
+        repaired = False
+        if is_regen:
+            reuse = set()
+            if failing_ids is not None:
+                stale = None
+                if not set_issues:
+                    stale = repair_questions(session_id, company_name, failing_ids, quality_feedback)
+                repaired = stale is not None
+                reuse = set(STAGE_ARTIFACTS) - stale if repaired else {"profile"}
+
+        reused = []
+        stages = {
+            name: (deps, checkpointed(name, session_id, stage_fns[name], reuse=name in reuse, reused=reused))
+            for name, deps in dependencies.items()
+        }
+        try:
+            results, stage_timings = run_stages(stages)
+        finally:
+            # Tokens spent by a failed attempt are billed too, so record them before it is retried
+            db.add_bedrock_usage(session_id, bedrock.usage.as_dict())
+        print(f"Generation stage timings (ms): {stage_timings}; reused checkpoints: {reused}")
 
-        brief = bedrock.generate_interviewer_brief(company_name, profile, questions)
-        packet = bedrock.generate_interviewee_packet(company_name, profile, packet_questions)
+        profile = results["profile"]
+        questions = results["questions"]["questions"]
+        archetype = archetype_of(profile)
 
-        brief_key = f"briefs/{session_id}/v1/interviewer_brief.json"
-        packet_key = f"packets/{session_id}/interviewee_packet.json"
-        profile_key = f"briefs/{session_id}/v1/company_profile.json"
-        questions_key = f"briefs/{session_id}/v1/questions.json"
+        brief_key = artifact_key("brief", session_id)
+        packet_key = artifact_key("packet", session_id)
+        profile_key = artifact_key("profile", session_id)
+        questions_key = artifact_key("questions", session_id)
 
-        s3.upload_json(brief_key, brief)
-        s3.upload_json(packet_key, packet)
-        s3.upload_json(profile_key, profile)
-        s3.upload_json(questions_key, {"questions": questions})
+        questions_ref = s3.payload_ref(questions_key, results["questions"])
 
         source_types = list({s.get("type", "unknown") for s in sources})
         source_types.append("bedrock_claude")
@@ -76,15 +267,20 @@ def handler(event, context):
             metadata={
                 "questionCount": len(questions),
                 "isRegeneration": is_regen,
+                "repairedQuestions": repaired,
                 "archetype": archetype,
+                "stageTimingsMs": stage_timings,
+                "checkpointsReused": reused,
             },
         )
 
         return step_function_response(200, {
             "briefS3Key": brief_key,
             "packetS3Key": packet_key,
-            "questions": questions,
+            "questionsRef": questions_ref,
             "profileArchetype": archetype,
+            "stageTimingsMs": stage_timings,
+            "checkpointsReused": reused,
         })
 
     except Exception as e:
@@ -10,51 +10,38 @@ def handler(event, context):
         session_id = event["pathParameters"]["sessionId"]
         user_id = event["requestContext"]["authorizer"]["claims"]["sub"]
 
-        interview = db.get_interview(session_id)
+        bundle = db.get_session_bundle(session_id)
+        interview = bundle.meta
+        brief_meta = bundle.latest_brief
+        corrections = bundle.corrections
+
         if not interview:
             return api_response(404, {"error": "Session not found"})
 
         if interview.get("interviewerId") != user_id:
             return api_response(403, {"error": "Access denied"})
 
-        brief_meta = db.get_latest_brief(session_id)
-        corrections = db.get_corrections(session_id)
-
-        brief_data = None
-        packet_data = None
-        profile_data = None
-        questions_data = None
-
         if brief_meta:
-            try:
-                brief_data = s3.get_json(brief_meta["briefS3Key"])
-            except Exception:
-                pass
-            try:
-                packet_data = s3.get_json(brief_meta["packetS3Key"])
-            except Exception:
-                pass
-
+            brief_key = brief_meta["briefS3Key"]
+            packet_key = brief_meta["packetS3Key"]
+        else:
+            # Sections of a brief still being generated are streamed here by generate_brief
+            brief_key = f"briefs/{session_id}/v1/interviewer_brief.partial.json"
+            packet_key = None
         profile_key = interview.get("profileKey")
-        if profile_key:
-            try:
-                profile_data = s3.get_json(profile_key)
-            except Exception:
-                pass
-
         questions_key = interview.get("questionsKey")
-        if questions_key:
-            try:
-                questions_data = s3.get_json(questions_key)
-            except Exception:
-                pass
+
+        artifacts = s3.get_json_many([brief_key, packet_key, profile_key, questions_key])
+        brief_data = artifacts.get(brief_key)
+        brief_partial = not brief_meta and brief_data is not None
 
         return api_response(200, {
             "session": interview,
             "brief": brief_data,
-            "packet": packet_data,
-            "profile": profile_data,
-            "questions": questions_data,
+            "briefPartial": brief_partial,
+            "packet": artifacts.get(packet_key),
+            "profile": artifacts.get(profile_key),
+            "questions": artifacts.get(questions_key),
             "corrections": corrections,
             "briefMeta": brief_meta,
         })
@@ -1,10 +1,28 @@
+import bisect
+import codecs
 import json
 import os
+import time
+import threading
 import boto3
+import urllib.error
 import urllib.request
+import urllib.parse
+import math
 import re
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, wait
 from html.parser import HTMLParser
-from shared import DynamoDBClient, S3Client, AuditLogger, step_function_response
+from shared import (
+    DynamoDBClient,
+    S3Client,
+    AuditLogger,
+    TieredCache,
+    cache_key,
+    estimate_tokens,
+    step_function_response,
+)
+from shared.tokens import CHARS_PER_TOKEN
 
 comprehend = boto3.client("comprehend")
 textract = boto3.client("textract")
@@ -13,6 +31,50 @@ s3_client = S3Client()
 audit = AuditLogger()
 BUCKET = os.environ.get("S3_BUCKET", "")
 
+MAX_FETCH_CONCURRENCY = int(os.environ.get("MAX_FETCH_CONCURRENCY", "8"))
+MAX_REQUESTS_PER_HOST = int(os.environ.get("MAX_REQUESTS_PER_HOST", "2"))
+INGEST_DEADLINE_SECONDS = int(os.environ.get("INGEST_DEADLINE_SECONDS", "120"))
+DEADLINE_SAFETY_MARGIN_MS = 30000  # leave room for chunking, Comprehend and S3 writes
+
+MAX_CHARS_PER_URL = 10000
+MAX_FETCH_BYTES = int(os.environ.get("MAX_FETCH_BYTES", str(2 * 1024 * 1024)))
+READ_CHUNK_BYTES = 64 * 1024
+
+PAGE_CACHE_TTL_SECONDS = int(os.environ.get("PAGE_CACHE_TTL_SECONDS", "86400"))
+page_cache = TieredCache("cache/pages", PAGE_CACHE_TTL_SECONDS, s3_client=s3_client)
+TRACKING_PARAM_PREFIXES = ("utm_", "fbclid", "gclid")
+
+COMPREHEND_SEGMENT_BYTES = 4500  # BatchDetect* accepts up to 5,000 UTF-8 bytes per document
+COMPREHEND_BATCH_SIZE = 25
+COMPREHEND_MAX_CONCURRENCY = int(os.environ.get("COMPREHEND_MAX_CONCURRENCY", "4"))
+MAX_COMPREHEND_SEGMENTS = int(os.environ.get("MAX_COMPREHEND_SEGMENTS", "200"))
+SYNC_TEXTRACT_MAX_BYTES = int(os.environ.get("SYNC_TEXTRACT_MAX_BYTES", str(512 * 1024)))
+TEXTRACT_POLL_SECONDS = 2
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+")
+# A sentence runs to terminal punctuation followed by whitespace, a newline, or end of text.
+SENTENCE_SPAN = re.compile(r"\S[^.!?\n]*(?:[.!?]+(?!\s|$)[^.!?\n]*)*(?:[.!?]+|\n|$)")
+
+CHUNK_TOKENS = int(os.environ.get("CHUNK_TOKENS", "800"))
+CHUNK_OVERLAP_TOKENS = int(os.environ.get("CHUNK_OVERLAP_TOKENS", "100"))
+
+CONTEXT_TOKEN_BUDGET = int(os.environ.get("CONTEXT_TOKEN_BUDGET", "12000"))
+BM25_K1 = 1.5
+BM25_B = 0.75
+SHINGLE_SIZE = 5
+NEAR_DUPLICATE_JACCARD = 0.8
+WORD = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it its of on or our that the their this to was we were with you your".split()
+)
+comprehend_stats = {"calls": 0}
+comprehend_stats_lock = threading.Lock()
+
+COMPREHEND_CACHE_TTL_SECONDS = int(os.environ.get("COMPREHEND_CACHE_TTL_SECONDS", str(30 * 86400)))
+comprehend_cache = TieredCache("cache/comprehend", COMPREHEND_CACHE_TTL_SECONDS, max_entries=1024, s3_client=s3_client)
+
+_host_locks = {}
+_host_locks_guard = threading.Lock()
+
 
 class HTMLTextExtractor(HTMLParser):
     """Strips HTML tags and extracts clean text."""
@@ -20,6 +82,7 @@ class HTMLTextExtractor(HTMLParser):
     def __init__(self):
         super().__init__()
         self.result = []
+        self.char_count = 0
         self._skip = False
         self._skip_tags = {"script", "style", "nav", "footer", "header"}
 
@@ -35,105 +98,487 @@ class HTMLTextExtractor(HTMLParser):
         if not self._skip:
             text = data.strip()
             if text:
+                if self.result:
+                    self.char_count += 1
                 self.result.append(text)
+                self.char_count += len(text)
 
     def get_text(self):
         return " ".join(self.result)
 
 
-def fetch_url_content(url):
+def read_html_text(resp, max_chars=MAX_CHARS_PER_URL, max_bytes=MAX_FETCH_BYTES):
+    """Feed the response body to HTMLTextExtractor chunk by chunk.
+
+    Stops reading the socket once max_chars of text have been extracted, the
+    declared Content-Length has been consumed, or max_bytes have been read.
+    """
+    charset = resp.headers.get_content_charset() or "utf-8"
     try:
-        req = urllib.request.Request(
-            url,
-            headers={"User-Agent": "TexasInsightsEngine/1.0 (Academic Research; Texas A&M University)"},
-        )
+        decoder = codecs.getincrementaldecoder(charset)(errors="ignore")
+    except LookupError:
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="ignore")
+
+    limit = max_bytes
+    content_length = resp.headers.get("Content-Length")
+    if content_length and content_length.isdigit():
+        limit = min(limit, int(content_length))
+
+    extractor = HTMLTextExtractor()
+    bytes_read = 0
+    while bytes_read < limit and extractor.char_count < max_chars:
+        data = resp.read(min(READ_CHUNK_BYTES, limit - bytes_read))
+        if not data:
+            break
+        bytes_read += len(data)
+        extractor.feed(decoder.decode(data))
+    extractor.feed(decoder.decode(b"", final=True))
+    extractor.close()
+    return extractor.get_text()[:max_chars]
+
+
+def fetch_url_content(url, validators=None):
+    """Return (text, validators). text is None when the server answers 304 Not Modified."""
+    headers = {"User-Agent": "TexasInsightsEngine/1.0 (Academic Research; Texas A&M University)"}
+    if validators:
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("lastModified"):
+            headers["If-Modified-Since"] = validators["lastModified"]
+    try:
+        req = urllib.request.Request(url, headers=headers)
         with urllib.request.urlopen(req, timeout=15) as resp:
-            html = resp.read().decode("utf-8", errors="ignore")
-        extractor = HTMLTextExtractor()
-        extractor.feed(html)
-        text = extractor.get_text()
-        return text[:10000]  # Cap at 10k chars per URL
+            new_validators = {
+                "etag": resp.headers.get("ETag", ""),
+                "lastModified": resp.headers.get("Last-Modified", ""),
+            }
+            return read_html_text(resp), new_validators
+    except urllib.error.HTTPError as e:
+        if e.code == 304:
+            return None, validators
+        print(f"Failed to fetch {url}: {e}")
+        return "", {}
     except Exception as e:
         print(f"Failed to fetch {url}: {e}")
-        return ""
-
+        return "", {}
+
+
+def normalize_url(url):
+    parts = urllib.parse.urlsplit(url.strip())
+    scheme = parts.scheme.lower() or "http"
+    host = (parts.hostname or "").lower()
+    if parts.port and (scheme, parts.port) not in (("http", 80), ("https", 443)):
+        host = f"{host}:{parts.port}"
+    query = sorted(
+        (k, v)
+        for k, v in urllib.parse.parse_qsl(parts.query, keep_blank_values=True)
+        if not k.lower().startswith(TRACKING_PARAM_PREFIXES)
+    )
+    path = parts.path.rstrip("/") or "/"
+    return urllib.parse.urlunsplit((scheme, host, path, urllib.parse.urlencode(query), ""))
+
+
+def fetch_cached_url(url):
+    """Return (text, cacheStatus) where cacheStatus is "hit", "revalidated" or "miss"."""
+    key = cache_key(normalize_url(url))
+    entry = page_cache.get_entry(key)
+    if entry and page_cache.is_fresh(entry):
+        return entry["value"]["text"], "hit"
+
+    validators = entry["value"].get("validators") if entry else None
+    text, new_validators = fetch_url_content(url, validators)
+    if text is None:
+        if entry:
+            page_cache.put(key, entry["value"])
+            return entry["value"]["text"], "revalidated"
+        text, new_validators = fetch_url_content(url)
+
+    if text:
+        page_cache.put(key, {"url": url, "text": text, "validators": new_validators})
+    return text, "miss"
+
+
+def _host_semaphore(url):
+    host = urllib.parse.urlsplit(url).netloc.lower()
+    with _host_locks_guard:
+        if host not in _host_locks:
+            _host_locks[host] = threading.BoundedSemaphore(MAX_REQUESTS_PER_HOST)
+        return _host_locks[host]
+
+
+def fetch_source(url):
+    with _host_semaphore(url):
+        return fetch_cached_url(url)
+
+
+def fetch_sources(urls, context=None):
+    """Fetch URLs concurrently; results keep the input order.
+
+    Work is bounded by MAX_FETCH_CONCURRENCY overall and MAX_REQUESTS_PER_HOST per
+    host. URLs still pending when the deadline passes are reported as None.
+    """
+    if not urls:
+        return []
 
-def chunk_text(text, chunk_size=1500, overlap=200):
-    words = text.split()
+    deadline = INGEST_DEADLINE_SECONDS
+    if context is not None and hasattr(context, "get_remaining_time_in_millis"):
+        remaining = (context.get_remaining_time_in_millis() - DEADLINE_SAFETY_MARGIN_MS) / 1000
+        deadline = max(1, min(deadline, remaining))
+
+    executor = ThreadPoolExecutor(max_workers=min(MAX_FETCH_CONCURRENCY, len(urls)))
+    futures = [executor.submit(fetch_source, url) for url in urls]
+    wait(futures, timeout=deadline)
+
+    results = []
+    for url, future in zip(urls, futures):
+        if future.done() and not future.exception():
+            results.append(future.result())
+        else:
+            if not future.done():
+                print(f"Deadline reached before {url} finished")
+            results.append(None)
+    executor.shutdown(wait=False, cancel_futures=True)
+    return results
+
+
+def _terms(text):
+    return [w for w in WORD.findall(text.lower()) if w not in STOPWORDS]
+
+
+def _shingles(terms):
+    if len(terms) < SHINGLE_SIZE:
+        return {tuple(terms)}
+    return {tuple(terms[i : i + SHINGLE_SIZE]) for i in range(len(terms) - SHINGLE_SIZE + 1)}
+
+
+def rank_chunks(chunks, query_terms):
+    """Return BM25 scores for each chunk against the weighted query terms."""
+    chunk_terms = [Counter(_terms(c["text"])) for c in chunks]
+    n = len(chunks)
+    avg_len = sum(sum(tf.values()) for tf in chunk_terms) / n if n else 0
+    doc_freq = Counter(term for tf in chunk_terms for term in tf)
+
+    scores = []
+    for tf in chunk_terms:
+        length = sum(tf.values())
+        score = 0.0
+        for term, weight in query_terms.items():
+            freq = tf.get(term)
+            if not freq:
+                continue
+            idf = math.log(1 + (n - doc_freq[term] + 0.5) / (doc_freq[term] + 0.5))
+            norm = freq + BM25_K1 * (1 - BM25_B + BM25_B * length / avg_len) if avg_len else freq
+            score += weight * idf * freq * (BM25_K1 + 1) / norm
+        scores.append(score)
+    return scores
+
+
+def select_context_chunks(chunks, company_name, entities, key_phrases, token_budget=CONTEXT_TOKEN_BUDGET):
+    """Pick the most relevant chunks that fit the token budget, skipping near-duplicates.
+
+    The query is the company name (weighted double), entity texts and key phrases.
+    A chunk whose word shingles overlap an already selected chunk's by at least
+    NEAR_DUPLICATE_JACCARD is treated as a duplicate.
+    """
+    query_terms = Counter()
+    for term in _terms(company_name):
+        query_terms[term] += 2
+    for text in [e["text"] for e in entities] + list(key_phrases):
+        for term in _terms(text):
+            query_terms[term] += 1
+
+    scores = rank_chunks(chunks, query_terms)
+    order = sorted(range(len(chunks)), key=lambda i: scores[i], reverse=True)
+
+    selected = []
+    selected_shingles = []
+    used_tokens = 0
+    for i in order:
+        if scores[i] <= 0 and selected:
+            break  # only unmatched chunks remain; fall back to them when nothing matched
+        chunk = chunks[i]
+        if used_tokens + chunk["tokens"] > token_budget:
+            continue
+        shingles = _shingles(_terms(chunk["text"]))
+        if any(
+            len(shingles & other) / len(shingles | other) >= NEAR_DUPLICATE_JACCARD
+            for other in selected_shingles
+        ):
+            continue
+        selected.append(dict(chunk, score=round(scores[i], 3)))
+        selected_shingles.append(shingles)
+        used_tokens += chunk["tokens"]
+    return selected
+
+
+def _sentence_spans(text, max_chars):
+    """(start, end) of each sentence, with sentences over max_chars cut at whitespace."""
+    spans = [match.span() for match in SENTENCE_SPAN.finditer(text)]
+    if all(end - start <= max_chars for start, end in spans):
+        return spans
+    split = []
+    for start, end in spans:
+        while end - start > max_chars:
+            cut = text.rfind(" ", start, start + max_chars)
+            if cut <= start:
+                cut = start + max_chars
+            split.append((start, cut))
+            start = cut
+            while start < end and text[start].isspace():
+                start += 1
+        if end > start:
+            split.append((start, end))
+    return split
+
+
+def chunk_documents(documents, max_tokens=CHUNK_TOKENS, overlap_tokens=CHUNK_OVERLAP_TOKENS):
+    """Split documents into chunks of at most max_tokens (estimated).
+
+    Chunks end on sentence boundaries, preferring paragraph breaks once half the
+    budget is used, and carry up to overlap_tokens of trailing sentences into the
+    next chunk. Chunks never span documents, so each keeps its document's source.
+    Each chunk is a slice of the original text: {"text", "source", "tokens"}.
+
+    Sentence ends are found in one regex pass; chunk ends are then located by
+    bisecting them, so the per-sentence work stays in C.
+    """
+    max_chars = max(1, int(max_tokens * CHARS_PER_TOKEN))
+    half_chars = max_chars // 2
+    overlap_chars = int(overlap_tokens * CHARS_PER_TOKEN)
     chunks = []
-    for i in range(0, len(words), chunk_size - overlap):
-        chunk = " ".join(words[i : i + chunk_size])
-        if chunk.strip():
-            chunks.append(chunk)
+    for doc in documents:
+        text = doc.get("text", "")
+        source = doc.get("source", "")
+        spans = _sentence_spans(text, max_chars)
+        starts = [start for start, _ in spans]
+        ends = [end for _, end in spans]
+        count = len(spans)
+        i = 0
+        last_end = 0
+        while i < count:
+            start = starts[i]
+            # Last sentence that fits the budget; every span fits on its own, so j >= i
+            j = bisect.bisect_right(ends, start + max_chars, i) - 1
+            # Close at the first paragraph break past half the budget, among sentences new to this chunk
+            newline = text.find("\n", max(start + half_chars, last_end), ends[j] + 1)
+            paragraph = newline != -1
+            if paragraph:
+                j = max(i, bisect.bisect_right(ends, newline + 1, i, j + 1) - 1)
+            chunk = text[start : ends[j]]
+            chunks.append({"text": chunk, "source": source, "tokens": estimate_tokens(chunk)})
+            if j == count - 1:
+                break
+            last_end = ends[j]
+            if paragraph:
+                i = j + 1
+                continue
+            # Carry trailing sentences within overlap_chars, leaving room for the next sentence
+            i = bisect.bisect_left(starts, max(last_end - overlap_chars, ends[j + 1] - max_chars), i + 1, j + 1)
     return chunks
 
 
-def extract_entities(text):
-    if not text or len(text) < 10:
-        return []
-    truncated = text[:4500]  # Comprehend limit
+def segment_text(text, max_bytes=COMPREHEND_SEGMENT_BYTES):
+    """Split text into Comprehend-sized segments, breaking on sentence boundaries."""
+    segments = []
+    current = []
+    current_bytes = 0
+    for sentence in SENTENCE_BOUNDARY.split(text):
+        size = len(sentence.encode("utf-8")) + 1
+        if size > max_bytes:
+            encoded = sentence.encode("utf-8")
+            pieces = [
+                encoded[i : i + max_bytes].decode("utf-8", errors="ignore")
+                for i in range(0, len(encoded), max_bytes)
+            ]
+        else:
+            pieces = [sentence]
+        for piece in pieces:
+            piece_bytes = len(piece.encode("utf-8")) + 1
+            if current and current_bytes + piece_bytes > max_bytes:
+                segments.append(" ".join(current))
+                current, current_bytes = [], 0
+            current.append(piece)
+            current_bytes += piece_bytes
+    if current:
+        segments.append(" ".join(current))
+    return [seg for seg in segments if len(seg.strip()) >= 10]
+
+
+def _detect_batch(operation, batch, parse):
+    """Parsed results for one Comprehend batch call, cached as a single entry.
+
+    A batch with segment errors is not cached, so the failed segments are retried next time.
+    """
+    key = cache_key(operation, batch)
+    cached = comprehend_cache.get(key)
+    if cached is not None:
+        return cached
+
+    results = [None] * len(batch)
     try:
-        resp = comprehend.detect_entities(Text=truncated, LanguageCode="en")
-        entities = []
-        seen = set()
-        for entity in resp["Entities"]:
-            key = (entity["Text"].lower(), entity["Type"])
-            if key not in seen and entity["Score"] > 0.8:
-                seen.add(key)
-                entities.append({
-                    "text": entity["Text"],
-                    "type": entity["Type"],
-                    "score": round(entity["Score"], 3),
-                })
-        return entities
+        resp = getattr(comprehend, operation)(TextList=batch, LanguageCode="en")
     except Exception as e:
-        print(f"Entity extraction failed: {e}")
+        print(f"{operation} failed: {e}")
+        return results
+    with comprehend_stats_lock:
+        comprehend_stats["calls"] += 1
+    for item in resp.get("ResultList", []):
+        results[item["Index"]] = parse(item)
+    errors = resp.get("ErrorList", [])
+    for error in errors:
+        print(f"{operation} error on segment {error['Index']} of batch: {error.get('ErrorMessage')}")
+    if not errors:
+        comprehend_cache.put(key, results)
+    return results
+
+
+def _detect_batched(operation, segments, parse):
+    """Run a Comprehend batch operation over segments, 25 per call, batches concurrently.
+
+    Returns one parsed result per segment (None where Comprehend reported an error).
+    Each batch is one cache entry, so a cached run costs one S3 read per batch
+    rather than one per segment.
+    """
+    batches = [segments[i : i + COMPREHEND_BATCH_SIZE] for i in range(0, len(segments), COMPREHEND_BATCH_SIZE)]
+    if not batches:
         return []
+    with ThreadPoolExecutor(max_workers=min(COMPREHEND_MAX_CONCURRENCY, len(batches))) as executor:
+        results = list(executor.map(lambda batch: _detect_batch(operation, batch, parse), batches))
+    return [result for batch_results in results for result in batch_results]
 
 
-def extract_key_phrases(text):
-    if not text or len(text) < 10:
-        return []
-    truncated = text[:4500]
-    try:
-        resp = comprehend.detect_key_phrases(Text=truncated, LanguageCode="en")
-        return [
-            kp["Text"]
-            for kp in resp["KeyPhrases"]
-            if kp["Score"] > 0.8
-        ][:20]
-    except Exception as e:
-        print(f"Key phrase extraction failed: {e}")
-        return []
+def _parse_entities(item):
+    return [
+        {"text": e["Text"], "type": e["Type"], "score": round(e["Score"], 3)}
+        for e in item["Entities"]
+        if e["Score"] > 0.8
+    ]
+
+
+def _parse_key_phrases(item):
+    return [kp["Text"] for kp in item["KeyPhrases"] if kp["Score"] > 0.8]
 
 
-def process_pdf(session_id, user_id):
+def extract_entities(segments):
+    entities = []
+    seen = set()
+    for result in _detect_batched("batch_detect_entities", segments, _parse_entities):
+        for entity in result or []:
+            key = (entity["text"].lower(), entity["type"])
+            if key not in seen:
+                seen.add(key)
+                entities.append(entity)
+    return entities
+
+
+def extract_key_phrases(segments, limit=20):
+    counts = Counter()
+    first_seen = {}
+    for result in _detect_batched("batch_detect_key_phrases", segments, _parse_key_phrases):
+        for phrase in result or []:
+            key = phrase.lower()
+            counts[key] += 1
+            first_seen.setdefault(key, phrase)
+    return [first_seen[key] for key, _ in counts.most_common(limit)]
+
+
+def _upload_pdf_page(session_id, page_number, lines):
+    s3_client.upload_text(f"extracted/{session_id}/pages/page-{page_number:04d}.txt", " ".join(lines))
+
+
+def _detect_text_sync(pdf_key):
+    resp = textract.detect_document_text(
+        Document={"S3Object": {"Bucket": BUCKET, "Name": pdf_key}}
+    )
+    lines = [
+        block["Text"]
+        for block in resp["Blocks"]
+        if block["BlockType"] == "LINE"
+    ]
+    return {1: lines}
+
+
+def _detect_text_async(session_id, pdf_key, deadline):
+    """Run an async Textract job and collect its paginated results.
+
+    Pages are written to extracted/{session_id}/pages/ as soon as the result
+    stream moves past them, so partial output survives a timeout.
+    """
+    job_id = textract.start_document_text_detection(
+        DocumentLocation={"S3Object": {"Bucket": BUCKET, "Name": pdf_key}}
+    )["JobId"]
+
+    while True:
+        resp = textract.get_document_text_detection(JobId=job_id, MaxResults=1000)
+        if resp["JobStatus"] != "IN_PROGRESS":
+            break
+        if time.monotonic() > deadline:
+            raise TimeoutError(f"Textract job {job_id} did not finish before the deadline")
+        time.sleep(TEXTRACT_POLL_SECONDS)
+
+    if resp["JobStatus"] == "FAILED":
+        raise RuntimeError(f"Textract job {job_id} failed: {resp.get('StatusMessage', '')}")
+    if resp["JobStatus"] == "PARTIAL_SUCCESS":
+        print(f"Textract job {job_id} partially succeeded: {resp.get('Warnings', [])}")
+
+    pages = {}
+    current_page = None
+    while True:
+        for block in resp["Blocks"]:
+            if block["BlockType"] != "LINE":
+                continue
+            page = block.get("Page", 1)
+            if current_page is not None and page != current_page and current_page in pages:
+                _upload_pdf_page(session_id, current_page, pages[current_page])
+            current_page = page
+            pages.setdefault(page, []).append(block["Text"])
+        token = resp.get("NextToken")
+        if not token:
+            break
+        resp = textract.get_document_text_detection(JobId=job_id, MaxResults=1000, NextToken=token)
+
+    if current_page in pages:
+        _upload_pdf_page(session_id, current_page, pages[current_page])
+    return pages
+
+
+def process_pdf(session_id, user_id, context=None):
+    """Extract text from the uploaded PDF; returns one string per page in page order.
+
+    Small files try the synchronous API first. Larger or multi-page documents,
+    which detect_document_text rejects, go through the async job API.
+    """
     pdf_key = f"uploads/{user_id}/{session_id}/document.pdf"
     try:
         s3_resource = boto3.client("s3")
-        s3_resource.head_object(Bucket=BUCKET, Key=pdf_key)
+        head = s3_resource.head_object(Bucket=BUCKET, Key=pdf_key)
     except Exception:
-        return "", []
+        return []
 
-    try:
-        resp = textract.detect_document_text(
-            Document={"S3Object": {"Bucket": BUCKET, "Name": pdf_key}}
-        )
-        lines = [
-            block["Text"]
-            for block in resp["Blocks"]
-            if block["BlockType"] == "LINE"
-        ]
-        text = " ".join(lines)
+    deadline = time.monotonic() + INGEST_DEADLINE_SECONDS
+    if context is not None and hasattr(context, "get_remaining_time_in_millis"):
+        remaining = (context.get_remaining_time_in_millis() - DEADLINE_SAFETY_MARGIN_MS) / 1000
+        deadline = time.monotonic() + max(1, remaining)
 
+    try:
+        pages = None
+        if head.get("ContentLength", 0) <= SYNC_TEXTRACT_MAX_BYTES:
+            try:
+                pages = _detect_text_sync(pdf_key)
+                _upload_pdf_page(session_id, 1, pages[1])
+            except Exception as e:
+                print(f"Sync Textract unavailable, using async job: {e}")
+        if pages is None:
+            pages = _detect_text_async(session_id, pdf_key, deadline)
+
+        page_texts = [" ".join(pages[n]) for n in sorted(pages)]
         extracted_key = f"extracted/{session_id}/textract_output.txt"
-        s3_client.upload_text(extracted_key, text)
+        s3_client.upload_text(extracted_key, "\n\n".join(page_texts))
 
-        entities = extract_entities(text)
-        return text, entities
+        return page_texts
     except Exception as e:
         print(f"Textract processing failed: {e}")
-        return "", []
+        return []
 
 
 def handler(event, context):
@@ -143,29 +588,46 @@ def handler(event, context):
         urls = event.get("urls", [])
         user_id = event.get("userId", "system")
         has_pdf = event.get("hasPdf", False)
+        comprehend_cache.reset_stats()
+        comprehend_stats["calls"] = 0
 
         all_text = []
-        all_entities = []
+        documents = []
         sources = []
 
-        for url in urls:
-            content = fetch_url_content(url)
+        started = time.monotonic()
+        for url, result in zip(urls, fetch_sources(urls, context)):
+            content, cache_status = result or ("", "miss")
             if content:
                 all_text.append(content)
-                entities = extract_entities(content)
-                all_entities.extend(entities)
-                sources.append({"type": "url", "url": url, "charCount": len(content)})
+                documents.append({"text": content, "source": url})
+                sources.append({"type": "url", "url": url, "charCount": len(content), "cache": cache_status})
+        print(f"Fetched {len(urls)} URLs in {time.monotonic() - started:.2f}s")
 
         if has_pdf:
-            pdf_text, pdf_entities = process_pdf(session_id, user_id)
+            pdf_pages = process_pdf(session_id, user_id, context)
+            pdf_text = " ".join(pdf_pages)
             if pdf_text:
                 all_text.append(pdf_text)
-                all_entities.extend(pdf_entities)
-                sources.append({"type": "pdf", "charCount": len(pdf_text)})
-
-        combined = " ".join(all_text)
-        chunks = chunk_text(combined) if combined else []
-        key_phrases = extract_key_phrases(combined) if combined else []
+                documents.extend(
+                    {"text": page, "source": f"pdf#page={n}"}
+                    for n, page in enumerate(pdf_pages, start=1)
+                )
+                sources.append({"type": "pdf", "charCount": len(pdf_text), "pageCount": len(pdf_pages)})
+
+        segments = [seg for text in all_text for seg in segment_text(text)]
+        if len(segments) > MAX_COMPREHEND_SEGMENTS:
+            print(f"Analysing first {MAX_COMPREHEND_SEGMENTS} of {len(segments)} segments")
+            segments = segments[:MAX_COMPREHEND_SEGMENTS]
+        all_entities = extract_entities(segments)
+        key_phrases = extract_key_phrases(segments)
+
+        chunks = chunk_documents(documents)
+        context_chunks = select_context_chunks(chunks, company_name, all_entities, key_phrases)
+        print(
+            f"Selected {len(context_chunks)} of {len(chunks)} chunks "
+            f"({sum(c['tokens'] for c in context_chunks)} tokens) for LLM context"
+        )
 
         if chunks:
             chunks_key = f"extracted/{session_id}/chunks.json"
@@ -192,13 +654,19 @@ def handler(event, context):
             sources=[s.get("url", s.get("type")) for s in sources],
         )
 
-        return step_function_response(200, {
-            "chunks": chunks[:15],  # Top 15 chunks for LLM context
+        context_ref = s3_client.store_payload(f"extracted/{session_id}/context.json", {
+            "chunks": context_chunks,
             "entities": unique_entities[:30],
-            "sources": sources,
             "keyPhrases": key_phrases,
         })
 
+        return step_function_response(200, {
+            "contextRef": context_ref,
+            "sources": sources,
+            "comprehendCache": comprehend_cache.stats(),
+            "comprehendCalls": comprehend_stats["calls"],
+        })
+
     except Exception as e:
         print(f"Ingestion error: {e}")
         raise
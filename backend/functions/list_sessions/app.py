@@ -3,11 +3,28 @@ from shared import DynamoDBClient, api_response
 
 db = DynamoDBClient()
 
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 100
+
 
 def handler(event, context):
     try:
         user_id = event["requestContext"]["authorizer"]["claims"]["sub"]
-        interviews = db.list_user_interviews(user_id)
+        params = event.get("queryStringParameters") or {}
+
+        try:
+            limit = int(params.get("limit", DEFAULT_PAGE_SIZE))
+        except ValueError:
+            return api_response(400, {"error": "limit must be an integer"})
+        if not 1 <= limit <= MAX_PAGE_SIZE:
+            return api_response(400, {"error": f"limit must be between 1 and {MAX_PAGE_SIZE}"})
+
+        try:
+            interviews, next_token = db.list_user_interviews(
+                user_id, limit=limit, next_token=params.get("nextToken"), status=params.get("status")
+            )
+        except ValueError:
+            return api_response(400, {"error": "Invalid nextToken"})
 
         sessions = []
         for item in interviews:
@@ -21,7 +38,11 @@ def handler(event, context):
                 "qualityScore": item.get("qualityScore"),
             })
 
-        return api_response(200, {"sessions": sessions})
+        body = {"sessions": sessions, "nextToken": next_token}
+        if not params.get("nextToken"):
+            # Totals cover every session, not just the loaded pages; sent with the first page only
+            body["statusCounts"] = db.count_user_interviews(user_id)
+        return api_response(200, body)
 
     except Exception as e:
         print(f"Error: {e}")
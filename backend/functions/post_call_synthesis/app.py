@@ -13,13 +13,16 @@ def handler(event, context):
         body = json.loads(event.get("body", "{}"))
         user_id = event["requestContext"]["authorizer"]["claims"]["sub"]
 
-        interview = db.get_interview(session_id)
+        bundle = db.get_session_bundle(session_id)
+        interview = bundle.meta
         if not interview:
             return api_response(404, {"error": "Session not found"})
 
         if interview.get("interviewerId") != user_id:
             return api_response(403, {"error": "Access denied"})
 
+        bedrock.start_session(session_id, context)
+
         interview_notes = {
             "corrections": body.get("corrections", []),
             "keyInsights": body.get("keyInsights", []),
@@ -37,13 +40,16 @@ def handler(event, context):
         profile_key = interview.get("profileKey")
         profile = s3.get_json(profile_key) if profile_key else {}
 
-        synthesis = bedrock.generate_post_call_synthesis(
-            interview["companyName"],
-            interview_notes,
-            profile,
-        )
+        try:
+            synthesis = bedrock.generate_post_call_synthesis(
+                interview["companyName"],
+                interview_notes,
+                profile,
+            )
+        finally:
+            db.add_bedrock_usage(session_id, bedrock.usage.as_dict())
 
-        current_brief = db.get_latest_brief(session_id)
+        current_brief = bundle.latest_brief
         current_version = current_brief.get("version", "v1") if current_brief else "v1"
         version_num = int(current_version.replace("v", ""))
 
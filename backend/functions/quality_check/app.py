@@ -1,8 +1,9 @@
 import json
 import re
-from shared import DynamoDBClient, AuditLogger, step_function_response, BedrockClient
+from shared import DynamoDBClient, S3Client, AuditLogger, step_function_response, BedrockClient
 
 db = DynamoDBClient()
+s3 = S3Client()
 audit = AuditLogger()
 bedrock = BedrockClient()
 
@@ -47,32 +48,42 @@ def check_non_leading(question_text):
 
 
 def check_question_quality(questions):
+    """Return (score, issues, failing question ids, set-level issues).
+
+    Set-level issues (question count, phase coverage) cannot be fixed by
+    rewriting individual questions, so they are also reported separately.
+    """
     all_issues = []
+    set_issues = []
     score = 100
 
     if len(questions) < 5:
-        all_issues.append(f"Too few questions: {len(questions)} (minimum 5)")
+        set_issues.append(f"Too few questions: {len(questions)} (minimum 5)")
         score -= 20
 
     phases_seen = set()
+    failing_ids = []
     for q in questions:
         q_text = q.get("question", "")
         issues = check_non_leading(q_text)
-        all_issues.extend(issues)
         score -= len(issues) * 10
 
         if not q.get("followUpStem"):
-            all_issues.append(f"Missing follow-up stem for: '{q_text[:40]}...'")
+            issues.append(f"Missing follow-up stem for: '{q_text[:40]}...'")
             score -= 5
 
         if not q.get("objective"):
-            all_issues.append(f"Missing objective for: '{q_text[:40]}...'")
+            issues.append(f"Missing objective for: '{q_text[:40]}...'")
             score -= 5
 
         if not q.get("coachingCue"):
-            all_issues.append(f"Missing coaching cue for: '{q_text[:40]}...'")
+            issues.append(f"Missing coaching cue for: '{q_text[:40]}...'")
             score -= 5
 
+        all_issues.extend(issues)
+        if issues and q.get("id"):
+            failing_ids.append(q["id"])
+
         phase = q.get("phase", "")
         if phase:
             phases_seen.add(phase)
@@ -80,10 +91,10 @@ def check_question_quality(questions):
     expected_phases = {"opening", "deep_dive", "strategic", "closing"}
     missing_phases = expected_phases - phases_seen
     if missing_phases:
-        all_issues.append(f"Missing question phases: {missing_phases}")
+        set_issues.append(f"Missing question phases: {missing_phases}")
         score -= len(missing_phases) * 5
 
-    return max(0, score), all_issues
+    return max(0, score), set_issues + all_issues, failing_ids, set_issues
 
 
 def handler(event, context):
@@ -92,9 +103,12 @@ def handler(event, context):
         user_id = event.get("userId", "system")
 
         generation = event.get("generationResult", {})
-        questions = generation.get("questions", [])
+        if "questionsRef" in generation:
+            questions = s3.load_payload(generation["questionsRef"]).get("questions", [])
+        else:
+            questions = generation.get("questions", [])
 
-        score, issues = check_question_quality(questions)
+        score, issues, failing_ids, set_issues = check_question_quality(questions)
         passed = score >= 60
 
         audit.log(
@@ -118,6 +132,8 @@ def handler(event, context):
             "passed": passed,
             "score": score,
             "issues": issues[:10],
+            "failingQuestionIds": failing_ids,
+            "setLevelIssues": set_issues,
         })
 
     except Exception as e:
@@ -31,17 +31,17 @@ def handler(event, context):
             )
             return api_response(200, {"message": "You have opted out. Your data will be removed."})
 
-        for idx, correction in enumerate(corrections):
-            if not correction.get("originalAssertion") or not correction.get("correction"):
-                continue
-            db.save_correction(session_id, idx, {
+        valid_corrections = [
+            (idx, {
                 "originalAssertion": correction["originalAssertion"],
                 "correction": correction["correction"],
                 "correctionType": correction.get("correctionType", "factual_error"),
                 "intervieweeNote": correction.get("note", ""),
             })
-
-        db.update_interview_status(session_id, "feedback_received", {
+            for idx, correction in enumerate(corrections)
+            if correction.get("originalAssertion") and correction.get("correction")
+        ]
+        db.save_feedback(session_id, valid_corrections, "feedback_received", {
             "selectedQuestions": selected_questions,
             "correctionCount": len(corrections),
         })
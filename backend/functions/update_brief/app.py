@@ -12,14 +12,17 @@ def handler(event, context):
         session_id = event["pathParameters"]["sessionId"]
         user_id = event["requestContext"]["authorizer"]["claims"]["sub"]
 
-        interview = db.get_interview(session_id)
+        bundle = db.get_session_bundle(session_id)
+        interview = bundle.meta
         if not interview:
             return api_response(404, {"error": "Session not found"})
 
         if interview.get("interviewerId") != user_id:
             return api_response(403, {"error": "Access denied"})
 
-        corrections = db.get_corrections(session_id)
+        bedrock.start_session(session_id, context)
+
+        corrections = bundle.corrections
         selected_questions = interview.get("selectedQuestions", [])
 
         profile_key = interview.get("profileKey")
@@ -41,15 +44,18 @@ def handler(event, context):
             for c in corrections
         ]
 
-        updated_brief = bedrock.generate_interviewer_brief(
-            interview["companyName"],
-            profile,
-            questions,
-            corrections=correction_list if correction_list else None,
-            selected_questions=selected_questions if selected_questions else None,
-        )
-
-        current_brief = db.get_latest_brief(session_id)
+        try:
+            updated_brief = bedrock.generate_interviewer_brief(
+                interview["companyName"],
+                profile,
+                questions,
+                corrections=correction_list if correction_list else None,
+                selected_questions=selected_questions if selected_questions else None,
+            )
+        finally:
+            db.add_bedrock_usage(session_id, bedrock.usage.as_dict())
+
+        current_brief = bundle.latest_brief
         current_version = current_brief.get("version", "v1") if current_brief else "v1"
         version_num = int(current_version.replace("v", "")) + 1
         new_version = f"v{version_num}"
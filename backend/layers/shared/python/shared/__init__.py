@@ -2,6 +2,8 @@ from shared.db import DynamoDBClient
 from shared.s3_utils import S3Client
 from shared.bedrock_client import BedrockClient
 from shared.audit import AuditLogger
+from shared.cache import TieredCache, cache_key
+from shared.tokens import estimate_tokens
 from shared.response import api_response, step_function_response
 
 __all__ = [
@@ -9,6 +11,9 @@ __all__ = [
     "S3Client",
     "BedrockClient",
     "AuditLogger",
+    "TieredCache",
+    "cache_key",
+    "estimate_tokens",
     "api_response",
     "step_function_response",
 ]
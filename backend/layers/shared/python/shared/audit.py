@@ -1,14 +1,27 @@
 import os
 import uuid
+import zlib
 import boto3
 from datetime import datetime, timezone
+from concurrent.futures import ThreadPoolExecutor
+from boto3.dynamodb.conditions import Key
 
 dynamodb = boto3.resource("dynamodb")
 
+# Events of a day are spread over AUDIT#{date}#{shard} partitions so one date is not a hot key
+AUDIT_SHARD_COUNT = int(os.environ.get("AUDIT_SHARD_COUNT", "8"))
+
 
 class AuditLogger:
-    def __init__(self):
+    """Writes each audit event synchronously with put_item, so a failed write fails the request."""
+
+    def __init__(self, shard_count=AUDIT_SHARD_COUNT):
         self.table = dynamodb.Table(os.environ["AUDIT_TABLE"])
+        self.shard_count = shard_count
+
+    def _partition(self, date_str, event_id):
+        shard = zlib.crc32(event_id.encode("utf-8")) % self.shard_count
+        return f"AUDIT#{date_str}#{shard}"
 
     def log(self, user_id, action, resource_id, sources=None, consent_ref=None, metadata=None):
         now = datetime.now(timezone.utc)
@@ -16,7 +29,7 @@ class AuditLogger:
         event_id = f"EVENT#{now.isoformat()}#{uuid.uuid4().hex[:8]}"
 
         item = {
-            "PK": f"AUDIT#{date_str}",
+            "PK": self._partition(date_str, event_id),
             "SK": event_id,
             "userId": user_id,
             "action": action,
@@ -31,3 +44,23 @@ class AuditLogger:
 
         self.table.put_item(Item=item)
         return event_id
+
+    def _query_partition(self, partition):
+        items = []
+        kwargs = {"KeyConditionExpression": Key("PK").eq(partition)}
+        while True:
+            resp = self.table.query(**kwargs)
+            items.extend(resp.get("Items", []))
+            if "LastEvaluatedKey" not in resp:
+                return items
+            kwargs["ExclusiveStartKey"] = resp["LastEvaluatedKey"]
+
+    def query_day(self, date_str):
+        """All audit events of a YYYY-MM-DD day in time order, read across shards concurrently.
+
+        Includes the unsharded AUDIT#{date} partition written before sharding.
+        """
+        partitions = [f"AUDIT#{date_str}"] + [f"AUDIT#{date_str}#{i}" for i in range(self.shard_count)]
+        with ThreadPoolExecutor(max_workers=len(partitions)) as executor:
+            results = executor.map(self._query_partition, partitions)
+        return sorted((item for items in results for item in items), key=lambda item: item["SK"])
@@ -1,55 +1,498 @@
 import os
 import json
+import time
+import threading
+import contextlib
 import boto3
-
-bedrock = boto3.client("bedrock-runtime")
+from botocore.config import Config
+from botocore.exceptions import ClientError, ParamValidationError
+from shared.cache import TieredCache, cache_key
+from shared.json_utils import JsonSectionAssembler, extract_json
+from shared.metrics import UsageTotals, emit_metrics, estimate_cost_usd
+from shared.prompt_context import encode_context
+from shared.prompts import (
+    PROFILE_SYSTEM_PROMPT, PROFILE_SCHEMA, QUESTION_SYSTEM_PROMPT, QUESTIONS_SCHEMA, REPAIR_SCHEMA,
+    BRIEF_SYSTEM_PROMPT, BRIEF_SCHEMA, PACKET_SYSTEM_PROMPT, PACKET_SCHEMA, SYNTHESIS_SYSTEM_PROMPT, SYNTHESIS_SCHEMA,
+)
+from shared.throttle import TokenBucket, DynamoSemaphore, call_with_backoff, error_code
+from shared.tokens import estimate_tokens
+
+BEDROCK_READ_TIMEOUT_SECONDS = int(os.environ.get("BEDROCK_READ_TIMEOUT_SECONDS", "90"))
+# Seconds of the Lambda timeout kept back after the last Bedrock retry for saving results
+BEDROCK_DEADLINE_RESERVE_SECONDS = int(os.environ.get("BEDROCK_DEADLINE_RESERVE_SECONDS", "15"))
+# Retries happen in call_with_backoff, so botocore's own retry loop is disabled
+bedrock = boto3.client(
+    "bedrock-runtime",
+    config=Config(retries={"max_attempts": 1, "mode": "standard"}, read_timeout=BEDROCK_READ_TIMEOUT_SECONDS),
+)
 MODEL_ID = os.environ.get("BEDROCK_MODEL_ID", "anthropic.claude-3-sonnet-20240229-v1:0")
+BEDROCK_CACHE_TTL_SECONDS = int(os.environ.get("BEDROCK_CACHE_TTL_SECONDS", str(7 * 86400)))
+BEDROCK_REQUESTS_PER_MINUTE = int(os.environ.get("BEDROCK_REQUESTS_PER_MINUTE", "50"))
+BEDROCK_TOKENS_PER_MINUTE = int(os.environ.get("BEDROCK_TOKENS_PER_MINUTE", "200000"))
+BEDROCK_MAX_CONCURRENCY = int(os.environ.get("BEDROCK_MAX_CONCURRENCY", "0"))
+# Stages called through the Converse API with prompt caching; the rest use invoke_model
+BEDROCK_CONVERSE_STAGES = [
+    stage.strip() for stage in os.environ.get(
+        "BEDROCK_CONVERSE_STAGES",
+        "generate_company_profile,generate_questions,repair_questions,"
+        "generate_interviewer_brief,generate_interviewee_packet,generate_post_call_synthesis",
+    ).split(",") if stage.strip()
+]
+CACHE_POINT = {"cachePoint": {"type": "default"}}
+# Shortest prompt prefix, in tokens, that a cache checkpoint accepts; matched as a
+# substring of the model id. Shorter prefixes are not cached, so no checkpoint is sent.
+CACHE_MIN_TOKENS = {
+    "anthropic.claude-3-haiku": 2048,
+    "anthropic.claude-3-5-haiku": 2048,
+}
+DEFAULT_CACHE_MIN_TOKENS = 1024
+# ValidationException messages that mean the model cannot take Converse or cache
+# points (anything else, e.g. an over-long input, would fail on invoke_model too)
+CONVERSE_REJECTION_HINTS = ("cach", "converse", "doesn't support", "does not support", "not supported")
+
+# Short, formulaic stages run on a cheaper model; anything else (and any stage
+# whose cheap output cannot be parsed) runs on MODEL_ID.
+BEDROCK_FAST_MODEL_ID = os.environ.get("BEDROCK_FAST_MODEL_ID", "anthropic.claude-3-haiku-20240307-v1:0")
+MODEL_ROUTES = {
+    "generate_questions": BEDROCK_FAST_MODEL_ID,
+    "generate_interviewee_packet": BEDROCK_FAST_MODEL_ID,
+}
+
+# Models that rejected a Converse request with cache points in this container
+_converse_unsupported = set()
+# Fast models this account cannot call (no model access, or not offered in the
+# region); their stages run on the strong model for the rest of the container
+UNAVAILABLE_MODEL_ERRORS = {"AccessDeniedException", "ResourceNotFoundException"}
+_unavailable_models = set()
+
+request_bucket = TokenBucket(BEDROCK_REQUESTS_PER_MINUTE)
+token_bucket = TokenBucket(BEDROCK_TOKENS_PER_MINUTE)
+
+
+def default_concurrency_limiter():
+    if BEDROCK_MAX_CONCURRENCY <= 0 or not os.environ.get("INTERVIEWS_TABLE"):
+        return None
+    return DynamoSemaphore(os.environ["INTERVIEWS_TABLE"], "bedrock", BEDROCK_MAX_CONCURRENCY)
+
+
+def default_response_cache():
+    if BEDROCK_CACHE_TTL_SECONDS <= 0:
+        return None
+    return TieredCache("cache/bedrock", BEDROCK_CACHE_TTL_SECONDS, max_entries=64)
+
+
+def cache_min_tokens(model_id):
+    matches = [name for name in CACHE_MIN_TOKENS if name in model_id]
+    return CACHE_MIN_TOKENS[max(matches, key=len)] if matches else DEFAULT_CACHE_MIN_TOKENS
+
+
+def _with_static_text(user_prompt, static_prefix):
+    """The user turn with the static text (e.g. an output schema) after the per-call context."""
+    return f"{user_prompt}\n\n{static_prefix}" if static_prefix else user_prompt
+
+
+def _rejects_converse(exc):
+    if error_code(exc) != "ValidationException":
+        return False
+    message = exc.response.get("Error", {}).get("Message", "").lower()
+    return any(hint in message for hint in CONVERSE_REJECTION_HINTS)
+
+
+def _converse_usage(usage):
+    """Converse usage in the invoke_model (Anthropic) field names."""
+    return {
+        "input_tokens": usage.get("inputTokens", 0),
+        "output_tokens": usage.get("outputTokens", 0),
+        "cache_read_input_tokens": usage.get("cacheReadInputTokens", 0),
+        "cache_creation_input_tokens": usage.get("cacheWriteInputTokens", 0),
+    }
+
+
+def _is_complete_json(text):
+    try:
+        return extract_json(text)[1]
+    except ValueError:
+        return False
 
 
 class BedrockClient:
-    def __init__(self, model_id=None):
+    def __init__(self, model_id=None, cache=None):
+        """cache is any object with get(key) / put(key, value); defaults to an LRU + S3 tier.
+
+        Set bypass_cache to force fresh completions (e.g. on regeneration); results
+        are still written back so later identical prompts hit. Every model call is
+        emitted as an EMF metric and added to usage; call start_session() per
+        invocation so both are attributed to the right interview. converse_stages
+        selects the generate_* methods that use the Converse API. routes maps
+        generate_* methods to model ids; set prefer_strong to ignore it (e.g. when
+        regenerating output that failed quality checks).
+        """
         self.model_id = model_id or MODEL_ID
+        self.cache = cache if cache is not None else default_response_cache()
+        self.bypass_cache = False
+        self.tokens_saved = 0
+        self._stats_lock = threading.Lock()
+        self.limiter = default_concurrency_limiter()
+        self.session_id = None
+        self.usage = UsageTotals()
+        self.converse_stages = set(BEDROCK_CONVERSE_STAGES)
+        self.routes = dict(MODEL_ROUTES)
+        self.prefer_strong = False
+        self.deadline = None
+
+    def start_session(self, session_id, context=None):
+        """Reset per-invocation state; with a Lambda context, retries stop before the function times out."""
+        self.session_id = session_id
+        self.usage = UsageTotals()
+        self.deadline = None
+        if context is not None:
+            remaining = context.get_remaining_time_in_millis() / 1000.0
+            self.deadline = time.monotonic() + remaining - BEDROCK_DEADLINE_RESERVE_SECONDS
+
+    def _route(self, stage):
+        """(model id, route label) for a stage."""
+        model_id = self.routes.get(stage, self.model_id)
+        if self.prefer_strong or model_id == self.model_id or model_id in _unavailable_models:
+            return self.model_id, "strong"
+        return model_id, "fast"
+
+    def _record_usage(self, stage, usage, latency_ms, model_id, route):
+        input_tokens = usage.get("input_tokens", 0)
+        output_tokens = usage.get("output_tokens", 0)
+        cache_read = usage.get("cache_read_input_tokens", 0)
+        cache_write = usage.get("cache_creation_input_tokens", 0)
+        cost = estimate_cost_usd(model_id, input_tokens, output_tokens, cache_read, cache_write)
+        with self._stats_lock:
+            self.usage.add(input_tokens, output_tokens, latency_ms, cost)
+        emit_metrics(
+            {"Stage": stage or "unknown", "ModelId": model_id, "Route": route},
+            {
+                "InputTokens": (input_tokens, "Count"),
+                "OutputTokens": (output_tokens, "Count"),
+                "CacheReadInputTokens": (cache_read, "Count"),
+                "CacheWriteInputTokens": (cache_write, "Count"),
+                "LatencyMs": (latency_ms, "Milliseconds"),
+                "EstimatedCostUsd": (cost, "None"),
+            },
+            {"SessionId": self.session_id},
+        )
 
-    def invoke(self, system_prompt, user_prompt, max_tokens=4096, temperature=0.3):
-        body = {
+    def _admit(self, system_prompt, user_prompt, max_tokens):
+        """Wait for request and token budget, then hold a shared concurrency slot."""
+        request_bucket.acquire(1)
+        token_bucket.acquire(estimate_tokens(system_prompt) + estimate_tokens(user_prompt) + max_tokens)
+        return self._slot() if self.limiter is not None else contextlib.nullcontext()
+
+    @contextlib.contextmanager
+    def _slot(self):
+        """Hold a concurrency slot; if none frees up in time, call anyway and let throttling retries pace it."""
+        try:
+            self.limiter.acquire(deadline=self.deadline)
+            acquired = True
+        except TimeoutError as e:
+            print(f"{e}, calling Bedrock without a concurrency slot")
+            acquired = False
+        try:
+            yield
+        finally:
+            if acquired:
+                self.limiter.release()
+
+    def _request_body(
+        self, system_prompt, user_prompt, max_tokens, temperature, assistant_prefix=None, static_prefix=None
+    ):
+        messages = [{"role": "user", "content": _with_static_text(user_prompt, static_prefix)}]
+        if assistant_prefix:
+            messages.append({"role": "assistant", "content": assistant_prefix})
+        return json.dumps({
             "anthropic_version": "bedrock-2023-05-31",
             "max_tokens": max_tokens,
             "temperature": temperature,
             "system": system_prompt,
-            "messages": [{"role": "user", "content": user_prompt}],
-        }
-        response = bedrock.invoke_model(
-            modelId=self.model_id,
-            contentType="application/json",
-            accept="application/json",
-            body=json.dumps(body),
+            "messages": messages,
+        })
+
+    def _uses_converse(self, stage, model_id):
+        # boto3 builds older than the Converse API (some Lambda runtimes) lack the operation
+        return (
+            stage in self.converse_stages
+            and model_id not in _converse_unsupported
+            and hasattr(bedrock, "converse")
         )
-        result = json.loads(response["body"].read())
-        return result["content"][0]["text"]
-
-    def invoke_with_json_output(self, system_prompt, user_prompt, max_tokens=4096):
-        raw = self.invoke(system_prompt, user_prompt, max_tokens, temperature=0.2)
-        start = raw.find("{")
-        end = raw.rfind("}") + 1
-        if start == -1 or end == 0:
-            start = raw.find("[")
-            end = raw.rfind("]") + 1
-        if start >= 0 and end > start:
-            return json.loads(raw[start:end])
-        raise ValueError(f"Could not parse JSON from LLM response: {raw[:200]}")
 
-    def generate_company_profile(self, company_name, context_chunks, urls):
-        system_prompt = """You are a senior business intelligence analyst at Texas A&M University's Mays Business School. 
-You generate structured company profiles for interview preparation. 
+    def _converse_request(
+        self, model_id, system_prompt, user_prompt, max_tokens, temperature, assistant_prefix=None, static_prefix=None
+    ):
+        """Converse arguments, with one cache point when the static text is long enough to cache.
+
+        The system prompt and static_prefix form a single cacheable prefix in the
+        system blocks. Below the model's minimum no cache point is sent and
+        static_prefix follows the user prompt, as on invoke_model.
+        """
+        static_blocks = [{"text": system_prompt}] + ([{"text": static_prefix}] if static_prefix else [])
+        if estimate_tokens(system_prompt + (static_prefix or "")) >= cache_min_tokens(model_id):
+            system = static_blocks + [CACHE_POINT]
+        else:
+            system = [{"text": system_prompt}]
+            user_prompt = _with_static_text(user_prompt, static_prefix)
+        messages = [{"role": "user", "content": [{"text": user_prompt}]}]
+        if assistant_prefix:
+            messages.append({"role": "assistant", "content": [{"text": assistant_prefix}]})
+        return {
+            "modelId": model_id,
+            "system": system,
+            "messages": messages,
+            "inferenceConfig": {"maxTokens": max_tokens, "temperature": temperature},
+        }
 
-GROUNDING RULES:
-- Never fabricate specific revenue figures, employee counts, or financial data unless clearly labeled as estimates with confidence ranges.
-- Distinguish between "public knowledge," "proprietary TAMU data," and "LLM inference."
-- All assertions must be falsifiable — the interviewee can confirm or deny them.
-- Tag every assertion with a confidence level: [High], [Medium], or [Low].
-- Tag every assertion with a source type: [Public], [Proprietary], or [Inferred].
-- Be transparent about uncertainty. It is better to say "we don't know" than to guess."""
+    def _call_converse(self, operation, request):
+        """Call a Converse operation; None if the model rejects Converse or prompt caching."""
+        try:
+            return call_with_backoff(lambda: operation(**request), deadline=self.deadline)
+        except (ClientError, ParamValidationError) as e:
+            if isinstance(e, ClientError) and not _rejects_converse(e):
+                raise
+            _converse_unsupported.add(request["modelId"])
+            print(f"Converse with prompt caching rejected for {request['modelId']}, using invoke_model: {e}")
+            return None
+
+    def _cache_lookup(self, key):
+        if self.cache is None or self.bypass_cache:
+            return None
+        cached = self.cache.get(key)
+        if cached is None:
+            return None
+        saved = cached.get("usage", {}).get("input_tokens", 0) + cached.get("usage", {}).get("output_tokens", 0)
+        with self._stats_lock:
+            self.tokens_saved += saved
+        stats = self.cache.stats() if hasattr(self.cache, "stats") else {}
+        lookups = stats.get("hits", 0) + stats.get("misses", 0)
+        print(
+            f"Bedrock cache hit ({stats.get('hits', 0)}/{lookups} lookups); "
+            f"saved {saved} tokens, {self.tokens_saved} total"
+        )
+        return cached
+
+    def invoke(
+        self,
+        system_prompt,
+        user_prompt,
+        max_tokens=4096,
+        temperature=0.3,
+        on_delta=None,
+        assistant_prefix=None,
+        cache_check=None,
+        stage=None,
+        static_prefix=None,
+        model_id=None,
+        route="strong",
+    ):
+        """Return the completion text, serving byte-identical requests from the cache.
+
+        With on_delta, the completion is streamed and on_delta(text) is called per
+        delta (once with the full text on a cache hit). assistant_prefix prefills
+        the assistant turn so the model continues from it; the returned text
+        excludes the prefix. Completions failing cache_check(text) are not cached.
+        stage names the caller in metrics; cache hits are not metered.
+
+        static_prefix is text identical across calls (e.g. an output schema) that
+        follows the user prompt. For stages in converse_stages the call goes
+        through the Converse API; there the system prompt and static_prefix are
+        marked as one cacheable prefix when they reach the model's minimum. model_id defaults to the client's model;
+        route labels the call in metrics.
+        """
+        model_id = model_id or self.model_id
+        key = cache_key(
+            model_id, temperature, max_tokens, system_prompt, static_prefix, user_prompt, assistant_prefix
+        )
+        cached = self._cache_lookup(key)
+        if cached is not None:
+            if on_delta:
+                on_delta(cached["text"])
+            return cached["text"]
+
+        started = time.monotonic()
+        args = (system_prompt, user_prompt, max_tokens, temperature)
+        usage = {}
+        try:
+            if on_delta is None:
+                text, completed = self._complete(
+                    model_id, *args, assistant_prefix, static_prefix, self._uses_converse(stage, model_id)
+                )
+                usage.update(completed)
+            else:
+                parts = []
+                for delta in self.invoke_stream(
+                    *args, usage=usage, assistant_prefix=assistant_prefix,
+                    static_prefix=static_prefix, converse=self._uses_converse(stage, model_id), model_id=model_id,
+                ):
+                    parts.append(delta)
+                    on_delta(delta)
+                text = "".join(parts)
+        finally:
+            # A stream that breaks off has still been billed for the tokens it reported
+            self._record_usage(stage, usage, int((time.monotonic() - started) * 1000), model_id, route)
+
+        if self.cache is not None and (cache_check is None or cache_check(text)):
+            self.cache.put(key, {"text": text, "usage": usage})
+        return text
+
+    def _complete(
+        self, model_id, system_prompt, user_prompt, max_tokens, temperature, assistant_prefix, static_prefix, converse
+    ):
+        """Non-streaming call; returns (text, usage)."""
+        with self._admit(system_prompt, (static_prefix or "") + user_prompt, max_tokens):
+            if converse:
+                request = self._converse_request(
+                    model_id, system_prompt, user_prompt, max_tokens, temperature, assistant_prefix, static_prefix
+                )
+                response = self._call_converse(bedrock.converse, request)
+                if response is not None:
+                    text = "".join(block.get("text", "") for block in response["output"]["message"]["content"])
+                    return text, _converse_usage(response.get("usage", {}))
+
+            body = self._request_body(
+                system_prompt, user_prompt, max_tokens, temperature, assistant_prefix, static_prefix
+            )
+            response = call_with_backoff(lambda: bedrock.invoke_model(
+                modelId=model_id,
+                contentType="application/json",
+                accept="application/json",
+                body=body,
+            ), deadline=self.deadline)
+            result = json.loads(response["body"].read())
+        return result["content"][0]["text"], result.get("usage", {})
+
+    def invoke_stream(
+        self,
+        system_prompt,
+        user_prompt,
+        max_tokens=4096,
+        temperature=0.3,
+        usage=None,
+        assistant_prefix=None,
+        static_prefix=None,
+        converse=False,
+        model_id=None,
+    ):
+        """Yield text deltas as the model produces them; fills usage (if given) with token counts.
+
+        Throttling is retried only when opening the stream; the concurrency slot
+        is held until the stream is consumed. With converse, ConverseStream is
+        used with prompt caching, falling back to invoke_model streaming when the
+        model rejects it.
+        """
+        model_id = model_id or self.model_id
+        with self._admit(system_prompt, (static_prefix or "") + user_prompt, max_tokens):
+            response = None
+            if converse and model_id not in _converse_unsupported:
+                request = self._converse_request(
+                    model_id, system_prompt, user_prompt, max_tokens, temperature, assistant_prefix, static_prefix
+                )
+                response = self._call_converse(bedrock.converse_stream, request)
+            if response is not None:
+                for event in response["stream"]:
+                    if "contentBlockDelta" in event:
+                        text = event["contentBlockDelta"]["delta"].get("text")
+                        if text:
+                            yield text
+                    elif "metadata" in event:
+                        if usage is not None:
+                            usage.update(_converse_usage(event["metadata"].get("usage", {})))
+                    elif not {"messageStart", "contentBlockStart", "contentBlockStop", "messageStop"} & set(event):
+                        error = next(iter(event.values()), {})
+                        raise RuntimeError(f"Bedrock stream error: {error.get('message', event)}")
+                return
+
+            body = self._request_body(
+                system_prompt, user_prompt, max_tokens, temperature, assistant_prefix, static_prefix
+            )
+            response = call_with_backoff(lambda: bedrock.invoke_model_with_response_stream(
+                modelId=model_id,
+                contentType="application/json",
+                accept="application/json",
+                body=body,
+            ), deadline=self.deadline)
+            for event in response["body"]:
+                if "chunk" not in event:
+                    error = next(iter(event.values()), {})
+                    raise RuntimeError(f"Bedrock stream error: {error.get('message', event)}")
+                data = json.loads(event["chunk"]["bytes"])
+                if data.get("type") == "content_block_delta" and data["delta"].get("type") == "text_delta":
+                    yield data["delta"]["text"]
+                elif usage is not None and data.get("type") == "message_start":
+                    usage.update(data["message"].get("usage", {}))
+                elif usage is not None and data.get("type") == "message_delta":
+                    usage.update(data.get("usage", {}))
+
+    def invoke_with_json_output(
+        self, system_prompt, user_prompt, max_tokens=4096, on_section=None, stage=None, static_prefix=None, route=None
+    ):
+        """Invoke and parse a JSON response.
+
+        With on_section, the response is streamed and on_section(key, value) is
+        called for each top-level member of the JSON object as soon as it closes.
+        The model comes from routes; a fast-model call that fails with a client
+        error, or whose output is unparseable or truncated, is redone on the
+        strong one.
+        """
+        model_id, default_route = self._route(stage)
+        if route is not None:
+            model_id = self.model_id  # explicit reroute (the fallback below) always targets the strong model
+        route = route or default_route
+
+        on_delta = None
+        if on_section is not None:
+            assembler = JsonSectionAssembler()
+
+            def on_delta(text):
+                for key, value in assembler.feed(text):
+                    on_section(key, value)
+
+        try:
+            raw = self.invoke(
+                system_prompt, user_prompt, max_tokens, temperature=0.2, on_delta=on_delta,
+                cache_check=_is_complete_json, stage=stage, static_prefix=static_prefix,
+                model_id=model_id, route=route,
+            )
+        except ClientError as e:
+            if route != "fast":
+                raise
+            if error_code(e) in UNAVAILABLE_MODEL_ERRORS:
+                _unavailable_models.add(model_id)
+            print(f"{stage} failed on {model_id}, falling back to {self.model_id}: {e}")
+            return self.invoke_with_json_output(
+                system_prompt, user_prompt, max_tokens, on_section, stage, static_prefix, route="fallback"
+            )
+        try:
+            value, complete = extract_json(raw)
+        except ValueError:
+            value, complete = None, False
+        # A repaired fast-model answer has silently lost its tail; the strong model redoes it
+        if value and (complete or route != "fast"):
+            if not complete:
+                print(f"Repaired truncated JSON response ({len(raw)} chars)")
+            return value
+
+        if route == "fast":
+            problem = "Truncated" if value else "Unparseable"
+            print(f"{problem} {stage} response from {model_id}, falling back to {self.model_id}: {raw[:200]}")
+            return self.invoke_with_json_output(
+                system_prompt, user_prompt, max_tokens, on_section, stage, static_prefix, route="fallback"
+            )
+
+        # Unrecoverable: ask the model to carry on from where it stopped (or to start
+        # the JSON) instead of failing the task and regenerating everything.
+        starts = [i for i in (raw.find("{"), raw.find("[")) if i != -1]
+        prefix = raw[min(starts):].rstrip() if starts else "{"
+        print(f"Unparseable JSON response, requesting continuation: {raw[:200]}")
+        continuation = self.invoke(
+            system_prompt, user_prompt, max_tokens, temperature=0.2, assistant_prefix=prefix,
+            stage=stage, static_prefix=static_prefix, model_id=model_id, route=route,
+        )
+        return extract_json(prefix + continuation)[0]
 
+    def generate_company_profile(self, company_name, context_chunks, urls):
         context_text = "\n\n".join(context_chunks) if context_chunks else "No proprietary context available."
 
         user_prompt = f"""Generate a comprehensive company intelligence profile for: {company_name}
@@ -57,265 +500,99 @@ GROUNDING RULES:
 AVAILABLE CONTEXT FROM PROVIDED SOURCES:
 {context_text}
 
-URLs PROVIDED: {json.dumps(urls)}
-
-Return a JSON object with this exact structure:
-{{
-  "companyOverview": "3-4 sentence plain-language summary",
-  "marketContext": "4-6 sentence industry dynamics, competitive landscape, macro trends",
-  "revenueModelHypothesis": {{
-    "description": "How the company likely makes money",
-    "confidence": "Low|Medium|High"
-  }},
-  "whatWeThinkWeKnow": [
-    {{
-      "assertion": "Specific testable hypothesis",
-      "confidence": "Low|Medium|High",
-      "sourceType": "Public|Proprietary|Inferred",
-      "source": "brief description of source"
-    }}
-  ],
-  "knowledgeGaps": [
-    "What we could not determine and should ask about"
-  ],
-  "industryClassification": {{
-    "industry": "",
-    "region": "",
-    "stage": "startup|growth|mature|enterprise",
-    "archetype": "service|saas|hardware_saas|manufacturing|other"
-  }}
-}}
-
-Generate 5-7 assertions for whatWeThinkWeKnow. Generate 3-5 knowledge gaps.
-Be specific and testable. Avoid vague generalizations."""
-
-        return self.invoke_with_json_output(system_prompt, user_prompt, max_tokens=3000)
-
-    def generate_questions(self, company_name, profile, archetype="service"):
-        system_prompt = """You are an expert interview coach at Texas A&M University's Mays Business School.
-You design strategically sequenced, open-ended, non-leading interview questions.
-
-RULES:
-- Never start questions with "Why don't you...", "Isn't it true that...", or "Don't you think..."
-- Never embed assumptions (e.g., "How do you handle your high churn?" assumes churn is high)
-- Prefer: "How do you think about...", "Walk us through...", "What drives...", "Help us understand..."
-- Each question must have a clear discovery objective
-- Sequence: Broad Context → Business Model → Specific Insight → Strategic Tension → Future Direction
-- Include follow-up stems and coaching cues for each question"""
+URLs PROVIDED: {json.dumps(urls)}"""
+
+        return self.invoke_with_json_output(
+            PROFILE_SYSTEM_PROMPT, user_prompt, max_tokens=3000,
+            static_prefix=PROFILE_SCHEMA, stage="generate_company_profile",
+        )
 
+    def generate_questions(self, company_name, profile, archetype="service", quality_feedback=None):
         user_prompt = f"""Generate interview questions for: {company_name}
 Company archetype: {archetype}
 
 COMPANY PROFILE:
-{json.dumps(profile, indent=2)}
-
-Return a JSON object:
-{{
-  "intervieweeQuestions": [
-    {{
-      "id": "q1",
-      "question": "The question text",
-      "followUpStem": "Pre-written follow-up probe",
-      "objective": "What this question aims to discover",
-      "coachingCue": "Right-side bracketed coaching note (max 15 words)",
-      "phase": "opening|deep_dive|strategic|closing"
-    }}
-  ]
-}}
-
-Generate exactly 8 questions. The first 5-6 should be included in the interviewee packet for selection.
-Make questions specific to the company profile, not generic."""
-
-        return self.invoke_with_json_output(system_prompt, user_prompt, max_tokens=3000)
-
-    def generate_interviewer_brief(self, company_name, profile, questions, corrections=None, selected_questions=None):
-        system_prompt = """You are a senior analyst generating an Interviewer Brief document for Texas A&M's business intelligence interview program.
-The brief should be comprehensive (2-3 pages worth of content), with right-side coaching cues in [BRACKETS].
-Format as structured HTML for easy rendering.
-Question split: The first 5-6 questions in the list are the packet menu (interviewee saw these and selects 2-3). The rest are interviewer-only. In page2_questionSequence: put interviewee-selected questions (when provided) in selectedQuestions; put all remaining questions in additionalQuestions (unselected menu questions first, then interviewer-only). Each question object must include id, question, followUpStem, objective, coachingCue, phase."""
+{encode_context(profile, "generate_questions", "profile")}"""
+        if quality_feedback:
+            user_prompt += f"""
+
+QUALITY FEEDBACK FROM PRIOR GENERATION (fix these issues):
+{encode_context(quality_feedback)}"""
+
+        return self.invoke_with_json_output(
+            QUESTION_SYSTEM_PROMPT, user_prompt, max_tokens=3000,
+            static_prefix=QUESTIONS_SCHEMA, stage="generate_questions",
+        )
 
+    def repair_questions(self, company_name, questions, issues):
+        """Rewrite only the questions that failed quality checks, keeping their ids and phases."""
+        user_prompt = f"""These interview questions for {company_name} failed quality review.
+
+QUALITY ISSUES:
+{encode_context(issues)}
+
+QUESTIONS TO REWRITE:
+{encode_context(questions, "repair_questions", "questions")}"""
+
+        return self.invoke_with_json_output(
+            QUESTION_SYSTEM_PROMPT, user_prompt, max_tokens=300 + 300 * len(questions),
+            static_prefix=REPAIR_SCHEMA, stage="repair_questions",
+        )
+
+    def generate_interviewer_brief(
+        self, company_name, profile, questions, corrections=None, selected_questions=None, on_section=None
+    ):
         corrections_text = ""
         if corrections:
             corrections_text = f"""
 INTERVIEWEE CORRECTIONS (highlight these prominently):
-{json.dumps(corrections, indent=2)}
+{encode_context(corrections)}
 Open the interview with: "Thanks for reviewing the packet. What did we get wrong?"
 """
 
         selected_text = ""
         if selected_questions:
-            selected_text = f"\nINTERVIEWEE-SELECTED QUESTIONS (prioritize these): {json.dumps(selected_questions)}"
+            selected_text = f"\nINTERVIEWEE-SELECTED QUESTIONS (prioritize these): {encode_context(selected_questions)}"
 
         user_prompt = f"""Generate a complete Interviewer Brief for: {company_name}
 
 COMPANY PROFILE:
-{json.dumps(profile, indent=2)}
+{encode_context(profile, "generate_interviewer_brief", "profile")}
 
 ALL QUESTIONS (full set for interviewer): The first 5-6 are the packet menu (interviewee sees these and selects 2-3). The rest are interviewer-only backup/deeper questions.
-{json.dumps(questions, indent=2)}
+{encode_context(questions, "generate_interviewer_brief", "questions")}
 {corrections_text}
-{selected_text}
-
-Return a JSON object:
-{{
-  "title": "Interviewer Brief: {{company_name}}",
-  "generatedAt": "timestamp",
-  "page1_companyContext": {{
-    "companyHeader": {{
-      "name": "",
-      "industry": "",
-      "region": "",
-      "stage": ""
-    }},
-    "companyOverview": "3-4 sentences with [COACHING CUES]",
-    "marketContext": "4-6 sentences with [COACHING CUES]",
-    "revenueModelHypothesis": {{
-      "text": "",
-      "confidence": ""
-    }},
-    "whatWeThinkWeKnow": [
-      {{
-        "assertion": "",
-        "confidence": "",
-        "sourceType": "",
-        "wasCorrection": false,
-        "correctionNote": ""
-      }}
-    ],
-    "openingCoachingCue": "[RIGHT-SIDE NOTE: Start by asking what we got wrong. Let them talk.]"
-  }},
-  "page2_questionSequence": {{
-    "selectedQuestions": [],
-    "additionalQuestions": [],
-    "knowledgeGaps": []
-  }},
-  "page3_insightCapture": {{
-    "liveNotesTemplate": {{
-      "corrections": [],
-      "keyInsights": [],
-      "surprises": [],
-      "followUpActions": []
-    }},
-    "closingProtocol": "Thank interviewee, confirm follow-up, ask permission to share summary",
-    "closingCoachingCue": "[Before hanging up, confirm top 3 constraints]"
-  }}
-}}"""
-
-        return self.invoke_with_json_output(system_prompt, user_prompt, max_tokens=4096)
+{selected_text}"""
 
-    def generate_interviewee_packet(self, company_name, profile, questions):
-        system_prompt = """You are generating a professional 1-page Interviewee Pre-Packet for Texas A&M University's Mays Business School.
-This packet is sent to a business leader before an interview. It must be:
-- Respectful and professional
-- Transparent about sources
-- Inviting corrections and engagement
-- Skimmable in 3 minutes
-The QUESTIONS provided are exactly the question menu (5-6 items). Use every one in questionMenu; the interviewee will select 2-3 that interest them."""
+        return self.invoke_with_json_output(
+            BRIEF_SYSTEM_PROMPT, user_prompt, max_tokens=4096, on_section=on_section,
+            static_prefix=BRIEF_SCHEMA, stage="generate_interviewer_brief",
+        )
 
+    def generate_interviewee_packet(self, company_name, profile, questions):
         user_prompt = f"""Generate an Interviewee Pre-Packet for: {company_name}
 
 COMPANY PROFILE:
-{json.dumps(profile, indent=2)}
+{encode_context(profile, "generate_interviewee_packet", "profile")}
 
 QUESTION MENU (use all of these in questionMenu; interviewee selects 2-3):
-{json.dumps(questions, indent=2)}
-
-Return a JSON object:
-{{
-  "header": {{
-    "institution": "Texas A&M University — Mays Business School",
-    "program": "Texas Insights Engine",
-    "companyName": "{company_name}",
-    "preparedFor": "Business Leader"
-  }},
-  "whatWeLearned": "3-5 paragraph summary of AI-gathered intelligence with [Source: type] tags",
-  "accuracyRequest": "Please let us know what we got right, what we got wrong, and what we missed. Your corrections make this conversation far more valuable.",
-  "questionMenu": [
-    {{
-      "id": "q1",
-      "question": "Open-ended, non-leading question",
-      "context": "Brief context for why this question matters"
-    }}
-  ],
-  "transparencyFooter": {{
-    "sourcesUsed": ["List of source types used"],
-    "statement": "No data was collected without your knowledge; all sources are public or provided by TAMU staff.",
-    "optOutNote": "You may opt out of this process at any time."
-  }}
-}}
-
-Include every question from the list above in questionMenu (same id and question text; add a short context for each). Make the whatWeLearned section engaging but humble."""
-
-        return self.invoke_with_json_output(system_prompt, user_prompt, max_tokens=3000)
+{encode_context(questions, "generate_interviewee_packet", "questions")}"""
 
-    def generate_post_call_synthesis(self, company_name, interview_notes, profile):
-        system_prompt = """You are mapping interview insights to the Texas Insights Engine knowledge graph schema.
-RULES:
-- Do not hallucinate beyond the provided notes
-- Flag unconfirmed assertions
-- Tag knowledge graph nodes appropriately
-- Distinguish between confirmed facts and inferences"""
+        return self.invoke_with_json_output(
+            PACKET_SYSTEM_PROMPT, user_prompt, max_tokens=3000,
+            static_prefix=PACKET_SCHEMA, stage="generate_interviewee_packet",
+        )
 
+    def generate_post_call_synthesis(self, company_name, interview_notes, profile):
         user_prompt = f"""Synthesize interview notes for: {company_name}
 
 INTERVIEW NOTES:
-{json.dumps(interview_notes, indent=2)}
+{encode_context(interview_notes)}
 
 ORIGINAL PROFILE:
-{json.dumps(profile, indent=2)}
-
-Return a JSON object matching the Texas Insights Engine schema:
-{{
-  "companyProfile": {{
-    "name": "{company_name}",
-    "industry": "",
-    "region": "",
-    "stage": "",
-    "employeeRange": "",
-    "revenueRange": "",
-    "ownershipType": ""
-  }},
-  "constraintMap": {{
-    "top3Constraints": [
-      {{
-        "constraint": "",
-        "type": "demand|fulfillment|capital|regulation|talent|execution",
-        "confirmed": true
-      }}
-    ]
-  }},
-  "marketStructure": {{
-    "regulatoryStructure": "",
-    "competitiveFragmentation": "",
-    "barriersToEntry": "",
-    "disintermediationRisk": ""
-  }},
-  "strategicTensions": [
-    {{
-      "tension": "",
-      "riskLevel": "low|medium|high",
-      "description": ""
-    }}
-  ],
-  "aiOpportunities": [
-    {{
-      "area": "",
-      "description": "",
-      "estimatedImpact": "low|medium|high"
-    }}
-  ],
-  "knowledgeGraphTags": {{
-    "industryCluster": "",
-    "riskFlags": [],
-    "growthSignals": [],
-    "relatedCompanies": []
-  }},
-  "unresolvedQuestions": [
-    "Questions for follow-up"
-  ],
-  "keyDeltasFromProfile": [
-    "What changed from the original AI profile based on the interview"
-  ]
-}}"""
-
-        return self.invoke_with_json_output(system_prompt, user_prompt, max_tokens=3000)
+{encode_context(profile, "generate_post_call_synthesis", "profile")}"""
+
+        return self.invoke_with_json_output(
+            SYNTHESIS_SYSTEM_PROMPT, user_prompt, max_tokens=3000,
+            static_prefix=SYNTHESIS_SCHEMA, stage="generate_post_call_synthesis",
+        )
@@ -0,0 +1,95 @@
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from shared.s3_utils import S3Client
+
+
+def cache_key(*parts):
+    raw = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class LRUCache:
+    """Thread-safe in-process LRU; lives as long as the warm container."""
+
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key not in self._items:
+                return None
+            self._items.move_to_end(key)
+            return self._items[key]
+
+    def put(self, key, value):
+        with self._lock:
+            self._items[key] = value
+            self._items.move_to_end(key)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+
+
+class TieredCache:
+    """In-process LRU in front of JSON entries stored under an S3 prefix.
+
+    Entries are {"value": ..., "cachedAt": epoch_seconds}. get() only returns
+    fresh values; get_entry() also returns stale ones so callers can revalidate.
+    Cache failures are logged and never raised.
+    """
+
+    def __init__(self, prefix, ttl_seconds, max_entries=256, s3_client=None):
+        self.prefix = prefix.rstrip("/")
+        self.ttl_seconds = ttl_seconds
+        self.memory = LRUCache(max_entries)
+        self.s3 = s3_client or S3Client()
+        self.hits = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+
+    def _s3_key(self, key):
+        return f"{self.prefix}/{key}.json"
+
+    def is_fresh(self, entry):
+        return time.time() - entry.get("cachedAt", 0) < self.ttl_seconds
+
+    def get_entry(self, key):
+        entry = self.memory.get(key)
+        if entry is not None:
+            return entry
+        try:
+            entry = self.s3.get_json(self._s3_key(key))
+        except Exception:
+            return None
+        self.memory.put(key, entry)
+        return entry
+
+    def get(self, key):
+        entry = self.get_entry(key)
+        fresh = entry is not None and self.is_fresh(entry)
+        with self._stats_lock:
+            if fresh:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return entry["value"] if fresh else None
+
+    def put(self, key, value):
+        entry = {"value": value, "cachedAt": time.time()}
+        self.memory.put(key, entry)
+        try:
+            self.s3.upload_json(self._s3_key(key), entry)
+        except Exception as e:
+            print(f"Cache write failed for {self.prefix}: {e}")
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses}
+
+    def reset_stats(self):
+        with self._stats_lock:
+            self.hits = 0
+            self.misses = 0
@@ -1,10 +1,71 @@
 import os
+import json
+import time
+import base64
 import boto3
+from dataclasses import dataclass, field
+from typing import Optional
 from datetime import datetime, timezone
-from boto3.dynamodb.conditions import Key
+from boto3.dynamodb.conditions import Key, Attr
+from boto3.dynamodb.types import TypeSerializer
+from botocore.exceptions import ClientError
 
 dynamodb = boto3.resource("dynamodb")
 
+# META attributes the dashboard lists; status and stage are DynamoDB reserved words
+SESSION_SUMMARY_FIELDS = ["sessionId", "companyName", "leaderName", "status", "stage", "GSI1SK", "qualityScore"]
+GSI1_KEY_FIELDS = ["PK", "SK", "GSI1PK", "GSI1SK"]
+MAX_LIST_QUERY_PAGES = 10
+MAX_TRANSACTION_ITEMS = 100  # DynamoDB TransactWriteItems limit
+TRANSACTION_CONFLICT_RETRIES = 3
+
+_serializer = TypeSerializer()
+
+
+def _serialize(values):
+    return {k: _serializer.serialize(v) for k, v in values.items()}
+
+
+def encode_page_token(last_key):
+    return base64.urlsafe_b64encode(json.dumps(last_key, sort_keys=True).encode("utf-8")).decode("ascii")
+
+
+def decode_page_token(token):
+    """Inverse of encode_page_token; raises ValueError for malformed tokens."""
+    try:
+        key = json.loads(base64.urlsafe_b64decode(token.encode("ascii")))
+    except (ValueError, UnicodeError) as e:
+        raise ValueError("Invalid page token") from e
+    if not isinstance(key, dict):
+        raise ValueError("Invalid page token")
+    return key
+
+
+def _version_number(item):
+    """Numeric version of a BRIEF#vN / SYNTHESIS#vN item; "v10" sorts before "v2" as a string."""
+    try:
+        return int(str(item.get("version") or item["SK"].split("#", 1)[1]).lstrip("v"))
+    except (KeyError, IndexError, ValueError):
+        return 0
+
+
+@dataclass
+class SessionBundle:
+    """Every item of one INTERVIEW# partition, split by sort key type."""
+
+    meta: Optional[dict] = None
+    briefs: list = field(default_factory=list)
+    corrections: list = field(default_factory=list)
+    syntheses: list = field(default_factory=list)
+
+    @property
+    def latest_brief(self):
+        return max(self.briefs, key=_version_number, default=None)
+
+    @property
+    def latest_synthesis(self):
+        return max(self.syntheses, key=_version_number, default=None)
+
 
 class DynamoDBClient:
     def __init__(self):
@@ -41,7 +102,28 @@ class DynamoDBClient:
         )
         return resp.get("Item")
 
-    def update_interview_status(self, session_id, status, extra_fields=None):
+    def get_session_bundle(self, session_id):
+        """Read META, briefs, corrections and syntheses of a session in one partition query."""
+        bundle = SessionBundle()
+        kwargs = {"KeyConditionExpression": Key("PK").eq(f"INTERVIEW#{session_id}")}
+        while True:
+            resp = self.interviews.query(**kwargs)
+            for item in resp.get("Items", []):
+                sk = item.get("SK", "")
+                if sk == "META":
+                    bundle.meta = item
+                elif sk.startswith("BRIEF#"):
+                    bundle.briefs.append(item)
+                elif sk.startswith("CORRECTION#"):
+                    bundle.corrections.append(item)
+                elif sk.startswith("SYNTHESIS#"):
+                    bundle.syntheses.append(item)
+            if "LastEvaluatedKey" not in resp:
+                return bundle
+            kwargs["ExclusiveStartKey"] = resp["LastEvaluatedKey"]
+
+    def _status_update(self, status, extra_fields=None):
+        """(UpdateExpression, values, names) setting status, updatedAt and extra_fields on META."""
         update_expr = "SET #status = :status, updatedAt = :now"
         expr_values = {
             ":status": status,
@@ -54,7 +136,10 @@ class DynamoDBClient:
                 update_expr += f", #{key} = :{key}"
                 expr_values[f":{key}"] = value
                 expr_names[f"#{key}"] = key
+        return update_expr, expr_values, expr_names
 
+    def update_interview_status(self, session_id, status, extra_fields=None):
+        update_expr, expr_values, expr_names = self._status_update(status, extra_fields)
         self.interviews.update_item(
             Key={"PK": f"INTERVIEW#{session_id}", "SK": "META"},
             UpdateExpression=update_expr,
@@ -62,6 +147,25 @@ class DynamoDBClient:
             ExpressionAttributeNames=expr_names,
         )
 
+    def add_bedrock_usage(self, session_id, usage):
+        """Add one invocation's Bedrock usage (UsageTotals.as_dict()) to the session totals on META."""
+        if not usage["calls"]:
+            return
+        self.interviews.update_item(
+            Key={"PK": f"INTERVIEW#{session_id}", "SK": "META"},
+            UpdateExpression=(
+                "ADD bedrockCalls :calls, bedrockInputTokens :input, bedrockOutputTokens :output, "
+                "bedrockLatencyMs :latency, bedrockCostMicroUsd :cost"
+            ),
+            ExpressionAttributeValues={
+                ":calls": usage["calls"],
+                ":input": usage["inputTokens"],
+                ":output": usage["outputTokens"],
+                ":latency": usage["latencyMs"],
+                ":cost": int(round(usage["costUsd"] * 1_000_000)),  # DynamoDB numbers must not be floats
+            },
+        )
+
     def save_brief(self, session_id, version, brief_data):
         now = datetime.now(timezone.utc).isoformat()
         self.interviews.put_item(
@@ -87,19 +191,62 @@ class DynamoDBClient:
         items = resp.get("Items", [])
         return items[0] if items else None
 
+    def _correction_item(self, session_id, idx, correction_data, now):
+        return {
+            "PK": f"INTERVIEW#{session_id}",
+            "SK": f"CORRECTION#{idx:04d}",
+            "originalAssertion": correction_data["originalAssertion"],
+            "correction": correction_data["correction"],
+            "correctionType": correction_data.get("correctionType", "factual_error"),
+            "intervieweeNote": correction_data.get("intervieweeNote", ""),
+            "timestamp": now,
+        }
+
     def save_correction(self, session_id, idx, correction_data):
         now = datetime.now(timezone.utc).isoformat()
-        self.interviews.put_item(
-            Item={
-                "PK": f"INTERVIEW#{session_id}",
-                "SK": f"CORRECTION#{idx:04d}",
-                "originalAssertion": correction_data["originalAssertion"],
-                "correction": correction_data["correction"],
-                "correctionType": correction_data.get("correctionType", "factual_error"),
-                "intervieweeNote": correction_data.get("intervieweeNote", ""),
-                "timestamp": now,
+        self.interviews.put_item(Item=self._correction_item(session_id, idx, correction_data, now))
+
+    def save_feedback(self, session_id, corrections, status, extra_fields=None):
+        """Write corrections and the META status update in as few requests as possible.
+
+        corrections is a list of (idx, correction_data). When everything fits in
+        one transaction the corrections and the status update commit atomically;
+        larger sets are batch-written (unprocessed items are retried by
+        batch_writer) before the status is updated.
+        """
+        now = datetime.now(timezone.utc).isoformat()
+        items = [self._correction_item(session_id, idx, data, now) for idx, data in corrections]
+
+        if len(items) + 1 > MAX_TRANSACTION_ITEMS:
+            with self.interviews.batch_writer() as batch:
+                for item in items:
+                    batch.put_item(Item=item)
+            self.update_interview_status(session_id, status, extra_fields)
+            return
+
+        update_expr, expr_values, expr_names = self._status_update(status, extra_fields)
+        table_name = self.interviews.name
+        actions = [{"Put": {"TableName": table_name, "Item": _serialize(item)}} for item in items]
+        actions.append({
+            "Update": {
+                "TableName": table_name,
+                "Key": _serialize({"PK": f"INTERVIEW#{session_id}", "SK": "META"}),
+                "UpdateExpression": update_expr,
+                "ExpressionAttributeValues": _serialize(expr_values),
+                "ExpressionAttributeNames": expr_names,
             }
-        )
+        })
+        client = self.interviews.meta.client
+        for attempt in range(TRANSACTION_CONFLICT_RETRIES):
+            try:
+                client.transact_write_items(TransactItems=actions)
+                return
+            except ClientError as e:
+                reasons = [r.get("Code") for r in e.response.get("CancellationReasons", [])]
+                if "TransactionConflict" not in reasons or attempt == TRANSACTION_CONFLICT_RETRIES - 1:
+                    raise
+                print(f"Feedback transaction conflict for {session_id}, retrying")
+                time.sleep(0.1 * (2 ** attempt))
 
     def get_corrections(self, session_id):
         resp = self.interviews.query(
@@ -122,13 +269,65 @@ class DynamoDBClient:
             }
         )
 
-    def list_user_interviews(self, user_id):
-        resp = self.interviews.query(
-            IndexName="GSI1",
-            KeyConditionExpression=Key("GSI1PK").eq(f"USER#{user_id}"),
-            ScanIndexForward=False,
-        )
-        return resp.get("Items", [])
+    def list_user_interviews(self, user_id, limit=50, next_token=None, status=None):
+        """Newest-first session summaries (SESSION_SUMMARY_FIELDS) of a user, one page at a time.
+
+        Returns (items, next_token); next_token is None on the last page. With
+        status, only sessions in that status are returned, so pages are filled
+        from further queries until limit items are found (up to
+        MAX_LIST_QUERY_PAGES queries; the page may then be short). Raises
+        ValueError for a token that is malformed or belongs to another user.
+        """
+        partition = f"USER#{user_id}"
+        projected = list(dict.fromkeys(SESSION_SUMMARY_FIELDS + GSI1_KEY_FIELDS))
+        kwargs = {
+            "IndexName": "GSI1",
+            "KeyConditionExpression": Key("GSI1PK").eq(partition),
+            "ScanIndexForward": False,
+            "ProjectionExpression": ", ".join(f"#{f}" for f in projected),
+            "ExpressionAttributeNames": {f"#{f}": f for f in projected},
+            "Limit": limit,
+        }
+        if status:
+            kwargs["FilterExpression"] = Attr("status").eq(status)
+        if next_token:
+            start_key = decode_page_token(next_token)
+            if start_key.get("GSI1PK") != partition:
+                raise ValueError("Invalid page token")
+            kwargs["ExclusiveStartKey"] = start_key
+
+        items = []
+        last_key = None
+        for _ in range(MAX_LIST_QUERY_PAGES):
+            resp = self.interviews.query(**kwargs)
+            items.extend(resp.get("Items", []))
+            last_key = resp.get("LastEvaluatedKey")
+            if len(items) > limit:
+                # Filtered pages can overshoot; resume after the last item returned
+                items = items[:limit]
+                last_key = {k: items[-1][k] for k in GSI1_KEY_FIELDS}
+            if not last_key or len(items) >= limit:
+                break
+            kwargs["ExclusiveStartKey"] = last_key
+        return items, encode_page_token(last_key) if last_key else None
+
+    def count_user_interviews(self, user_id):
+        """{status: session count} over all of a user's sessions, reading only the status attribute."""
+        kwargs = {
+            "IndexName": "GSI1",
+            "KeyConditionExpression": Key("GSI1PK").eq(f"USER#{user_id}"),
+            "ProjectionExpression": "#status",
+            "ExpressionAttributeNames": {"#status": "status"},
+        }
+        counts = {}
+        while True:
+            resp = self.interviews.query(**kwargs)
+            for item in resp.get("Items", []):
+                status = item.get("status", "unknown")
+                counts[status] = counts.get(status, 0) + 1
+            if "LastEvaluatedKey" not in resp:
+                return counts
+            kwargs["ExclusiveStartKey"] = resp["LastEvaluatedKey"]
 
     def update_insights_engine(self, company_name, profile_data):
         now = datetime.now(timezone.utc).isoformat()
@@ -0,0 +1,186 @@
+import json
+
+
+class JsonSectionAssembler:
+    """Incrementally scans streamed text for a top-level JSON object.
+
+    feed() returns the (key, value) pairs of top-level members that closed in the
+    new text, so large responses can be persisted section by section before the
+    model finishes. Text before the opening brace (e.g. a preamble) is ignored.
+    """
+
+    def __init__(self):
+        self.buffer = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._expect = "root"  # root -> key -> colon -> value -> comma
+        self._key_start = None
+        self._key = None
+        self._value_start = None
+        self.done = False
+
+    def _emit(self, end):
+        raw = self.buffer[self._value_start:end]
+        self._value_start = None
+        self._expect = "comma"
+        try:
+            return [(self._key, json.loads(raw))]
+        except ValueError:
+            return []
+
+    def feed(self, text):
+        self.buffer += text
+        sections = []
+        buf = self.buffer
+        i = self._pos
+        while i < len(buf) and not self.done:
+            ch = buf[i]
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._expect == "key":
+                        self._key = json.loads(buf[self._key_start:i + 1])
+                        self._expect = "colon"
+                    elif self._depth == 1 and self._expect == "value":
+                        sections.extend(self._emit(i + 1))
+            elif self._expect == "root":
+                if ch == "{":
+                    self._depth = 1
+                    self._expect = "key"
+            elif ch == '"':
+                self._in_string = True
+                if self._depth == 1 and self._expect == "key":
+                    self._key_start = i
+                elif self._depth == 1 and self._expect == "value" and self._value_start is None:
+                    self._value_start = i
+            elif ch in "{[":
+                if self._depth == 1 and self._value_start is None:
+                    self._value_start = i
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 1 and self._value_start is not None:
+                    sections.extend(self._emit(i + 1))
+                elif self._depth == 0:
+                    if self._value_start is not None:
+                        sections.extend(self._emit(i))
+                    self.done = True
+            elif self._depth == 1:
+                if ch == ":" and self._expect == "colon":
+                    self._expect = "value"
+                elif ch == ",":
+                    if self._value_start is not None:
+                        sections.extend(self._emit(i))
+                    self._expect = "key"
+                elif not ch.isspace() and self._expect == "value" and self._value_start is None:
+                    self._value_start = i
+            i += 1
+        self._pos = i
+        return sections
+
+
+_CLOSERS = {"{": "}", "[": "]"}
+MAX_REPAIR_ATTEMPTS = 64
+_decoder = json.JSONDecoder()
+
+
+def _scan(raw, start):
+    """Scan from an opening bracket at start.
+
+    Returns (end, None) when the value closes at raw[end - 1], otherwise
+    (None, state) for truncated text where state is (cut points, open stack,
+    in_string). Cut points are (index, stack) pairs where the text can be cut
+    and closed off to yield valid JSON.
+    """
+    stack = []
+    cuts = []
+    in_string = False
+    escape = False
+    for i in range(start, len(raw)):
+        ch = raw[i]
+        if in_string:
+            if escape:
+                escape = False
+            elif ch == "\\":
+                escape = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch in _CLOSERS:
+            stack.append(ch)
+            cuts.append((i + 1, tuple(stack)))
+        elif ch in "}]":
+            if not stack or _CLOSERS[stack[-1]] != ch:
+                return None, None
+            stack.pop()
+            if not stack:
+                return i + 1, None
+            cuts.append((i + 1, tuple(stack)))
+        elif ch == ",":
+            cuts.append((i, tuple(stack)))
+    return None, (cuts, tuple(stack), in_string)
+
+
+def _repair(raw, start, state):
+    """Close the truncated JSON value starting at raw[start], dropping any trailing partial member.
+
+    Cut points in state are offsets into raw, as recorded by _scan.
+    """
+    cuts, stack, in_string = state
+    candidates = [(len(raw), stack)] + cuts[::-1][: MAX_REPAIR_ATTEMPTS - 1]
+    for cut, open_stack in candidates:
+        text = raw[start:cut] + ('"' if in_string and cut == len(raw) else "")
+        closed = text.rstrip().rstrip(",") + "".join(_CLOSERS[c] for c in reversed(open_stack))
+        try:
+            return json.loads(closed)
+        except ValueError:
+            continue
+    return None
+
+
+def extract_json(raw):
+    """Return (value, complete) for the first JSON object or array in raw.
+
+    Prose around the value, including prose containing braces, is skipped.
+    When the text ends inside a value (e.g. the model hit max_tokens), it is
+    closed off at the last point that yields valid JSON and complete is False.
+    Raises ValueError when no usable JSON is found.
+    """
+    starts = [i for i in (raw.find("{"), raw.find("[")) if i != -1]
+    if starts:
+        try:
+            return _decoder.raw_decode(raw, min(starts))[0], True
+        except ValueError:
+            pass  # prose braces before the value, or truncation: fall back to scanning
+
+    pos = 0
+    truncated = None
+    while True:
+        starts = [i for i in (raw.find("{", pos), raw.find("[", pos)) if i != -1]
+        if not starts:
+            break
+        start = min(starts)
+        end, state = _scan(raw, start)
+        if end is not None:
+            try:
+                return json.loads(raw[start:end]), True
+            except ValueError:
+                pass
+        elif state is not None:
+            truncated = (start, state)
+            break  # the scan reached the end, so any later start is nested inside this value
+        pos = start + 1
+
+    if truncated is not None:
+        start, state = truncated
+        value = _repair(raw, start, state)
+        if value is not None:
+            return value, False
+    raise ValueError(f"Could not parse JSON from LLM response: {raw[:200]}")
@@ -0,0 +1,83 @@
+import os
+import json
+import time
+
+METRICS_NAMESPACE = os.environ.get("METRICS_NAMESPACE", "TexasInsightsEngine")
+
+# On-demand USD per million (input, output) tokens; matched as a substring of the model id
+MODEL_PRICES = {
+    "anthropic.claude-3-haiku": (0.25, 1.25),
+    "anthropic.claude-3-5-haiku": (0.80, 4.00),
+    "anthropic.claude-3-sonnet": (3.00, 15.00),
+    "anthropic.claude-3-5-sonnet": (3.00, 15.00),
+    "anthropic.claude-3-7-sonnet": (3.00, 15.00),
+    "anthropic.claude-3-opus": (15.00, 75.00),
+}
+
+
+# Prompt cache reads and writes are billed relative to the input token price
+CACHE_READ_PRICE_FACTOR = 0.1
+CACHE_WRITE_PRICE_FACTOR = 1.25
+
+
+def estimate_cost_usd(model_id, input_tokens, output_tokens, cache_read_tokens=0, cache_write_tokens=0):
+    """Estimated on-demand cost of a call; 0.0 for models missing from MODEL_PRICES."""
+    matches = [name for name in MODEL_PRICES if name in model_id]
+    if not matches:
+        return 0.0
+    input_price, output_price = MODEL_PRICES[max(matches, key=len)]
+    billed_input = (
+        input_tokens
+        + cache_read_tokens * CACHE_READ_PRICE_FACTOR
+        + cache_write_tokens * CACHE_WRITE_PRICE_FACTOR
+    )
+    return (billed_input * input_price + output_tokens * output_price) / 1_000_000
+
+
+def emit_metrics(dimensions, metrics, properties=None, namespace=None):
+    """Print a CloudWatch Embedded Metric Format line.
+
+    metrics maps name -> (value, unit). properties are logged alongside the
+    metrics (searchable in Logs Insights) without becoming dimensions.
+    """
+    record = {
+        "_aws": {
+            "Timestamp": int(time.time() * 1000),
+            "CloudWatchMetrics": [{
+                "Namespace": namespace or METRICS_NAMESPACE,
+                "Dimensions": [list(dimensions)],
+                "Metrics": [{"Name": name, "Unit": unit} for name, (_, unit) in metrics.items()],
+            }],
+        },
+    }
+    record.update(properties or {})
+    record.update(dimensions)
+    record.update({name: value for name, (value, _) in metrics.items()})
+    print(json.dumps(record, default=str))
+
+
+class UsageTotals:
+    """Bedrock usage accumulated over one handler invocation."""
+
+    def __init__(self):
+        self.calls = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.latency_ms = 0
+        self.cost_usd = 0.0
+
+    def add(self, input_tokens, output_tokens, latency_ms, cost_usd):
+        self.calls += 1
+        self.input_tokens += input_tokens
+        self.output_tokens += output_tokens
+        self.latency_ms += latency_ms
+        self.cost_usd += cost_usd
+
+    def as_dict(self):
+        return {
+            "calls": self.calls,
+            "inputTokens": self.input_tokens,
+            "outputTokens": self.output_tokens,
+            "latencyMs": self.latency_ms,
+            "costUsd": round(self.cost_usd, 6),
+        }
@@ -0,0 +1,73 @@
+import json
+
+# Fields each prompt needs from the data it embeds. A spec maps field -> None
+# (keep as is) or a nested spec applied to a dict value or to each item of a list.
+# Data without a spec for a stage is embedded whole.
+_ASSERTION_FIELDS = {"assertion": None, "confidence": None, "sourceType": None}
+STAGE_FIELDS = {
+    "generate_questions": {
+        "profile": {
+            "companyOverview": None,
+            "marketContext": None,
+            "revenueModelHypothesis": None,
+            "whatWeThinkWeKnow": {"assertion": None, "confidence": None},
+            "knowledgeGaps": None,
+            "industryClassification": None,
+        },
+    },
+    "repair_questions": {
+        "questions": {"id": None, "question": None, "objective": None, "phase": None},
+    },
+    "generate_interviewer_brief": {
+        "profile": {
+            "companyOverview": None,
+            "marketContext": None,
+            "revenueModelHypothesis": None,
+            "whatWeThinkWeKnow": _ASSERTION_FIELDS,
+            "knowledgeGaps": None,
+            "industryClassification": None,
+        },
+    },
+    "generate_interviewee_packet": {
+        "profile": {
+            "companyOverview": None,
+            "marketContext": None,
+            "revenueModelHypothesis": None,
+            "whatWeThinkWeKnow": dict(_ASSERTION_FIELDS, source=None),
+        },
+        "questions": {"id": None, "question": None},
+    },
+}
+
+
+def prune(value, spec):
+    if spec is None:
+        return value
+    if isinstance(value, list):
+        return [prune(item, spec) for item in value]
+    if isinstance(value, dict):
+        return {k: prune(value[k], sub) for k, sub in spec.items() if k in value}
+    return value
+
+
+def _drop_empty(value):
+    if isinstance(value, dict):
+        value = {k: _drop_empty(v) for k, v in value.items()}
+        return {k: v for k, v in value.items() if v not in ("", None, [], {})}
+    if isinstance(value, list):
+        return [_drop_empty(item) for item in value]
+    return value
+
+
+def compact_json(value):
+    return json.dumps(value, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def encode_context(value, stage=None, name=None):
+    """Minified JSON of value for embedding in a prompt.
+
+    Empty fields are dropped, and fields the stage's prompt does not use (per
+    STAGE_FIELDS[stage][name]) are pruned.
+    """
+    spec = STAGE_FIELDS.get(stage, {}).get(name)
+    return compact_json(_drop_empty(prune(value, spec)))
@@ -1,9 +1,14 @@
 import os
 import json
 import boto3
+from concurrent.futures import ThreadPoolExecutor
+from botocore.config import Config
 
-s3 = boto3.client("s3")
+S3_MAX_CONCURRENCY = int(os.environ.get("S3_MAX_CONCURRENCY", "8"))
+# boto3 clients are thread-safe; the pool must fit every concurrent get_json_many read
+s3 = boto3.client("s3", config=Config(max_pool_connections=max(10, S3_MAX_CONCURRENCY)))
 BUCKET = os.environ.get("S3_BUCKET", "")
+INLINE_PAYLOAD_BYTES = int(os.environ.get("INLINE_PAYLOAD_BYTES", "32768"))
 
 
 class S3Client:
@@ -23,6 +28,47 @@ class S3Client:
         resp = s3.get_object(Bucket=self.bucket, Key=key)
         return json.loads(resp["Body"].read().decode("utf-8"))
 
+    def get_json_many(self, keys, max_workers=S3_MAX_CONCURRENCY):
+        """Fetch JSON objects concurrently; returns {key: data} for the keys that loaded.
+
+        A missing or unreadable object is left out of the result instead of failing the others.
+        """
+        keys = list(dict.fromkeys(k for k in keys if k))
+        if not keys:
+            return {}
+
+        def load(key):
+            try:
+                return key, self.get_json(key)
+            except Exception as e:
+                if getattr(e, "response", {}).get("Error", {}).get("Code") not in ("NoSuchKey", "404"):
+                    print(f"Could not load s3://{self.bucket}/{key}: {e}")
+                return key, None
+
+        with ThreadPoolExecutor(max_workers=min(max_workers, len(keys))) as executor:
+            loaded = list(executor.map(load, keys))
+        return {key: data for key, data in loaded if data is not None}
+
+    def store_payload(self, key, data, inline_limit=INLINE_PAYLOAD_BYTES):
+        """Claim-check for Step Functions state: write data to S3 and return a reference.
+
+        Payloads up to inline_limit bytes also travel inline so consumers can skip the read.
+        """
+        self.upload_json(key, data)
+        return self.payload_ref(key, data, inline_limit)
+
+    def payload_ref(self, key, data, inline_limit=INLINE_PAYLOAD_BYTES):
+        """Reference to data that is already stored at key (see store_payload)."""
+        ref = {"s3Key": key}
+        if len(json.dumps(data, default=str).encode("utf-8")) <= inline_limit:
+            ref["inline"] = data
+        return ref
+
+    def load_payload(self, ref):
+        if "inline" in ref:
+            return ref["inline"]
+        return self.get_json(ref["s3Key"])
+
     def upload_text(self, key, text, content_type="text/plain"):
         s3.put_object(
             Bucket=self.bucket,
@@ -0,0 +1,166 @@
+import time
+import uuid
+import random
+import threading
+import boto3
+from boto3.dynamodb.conditions import Key
+from botocore.exceptions import ClientError, ConnectionError as BotocoreConnectionError, HTTPClientError
+
+dynamodb = boto3.resource("dynamodb")
+
+RETRYABLE_ERRORS = {
+    "ThrottlingException",
+    "ModelTimeoutException",
+    "ModelNotReadyException",
+    "ServiceUnavailableException",
+    "TooManyRequestsException",
+    "InternalServerException",
+}
+# Transport failures (connection refused/reset, read timeouts) are retried like throttling
+RETRYABLE_EXCEPTIONS = (BotocoreConnectionError, HTTPClientError)
+
+
+def error_code(exc):
+    if isinstance(exc, ClientError):
+        return exc.response.get("Error", {}).get("Code", "")
+    return ""
+
+
+def call_with_backoff(fn, max_attempts=6, base_delay=1.0, max_delay=30.0, deadline=None):
+    """Call fn, retrying throttling, timeouts and transient server/network errors with full-jitter backoff.
+
+    deadline is a time.monotonic() value; no retry is started after it, so the
+    retries of one call cannot outlast the Lambda invocation.
+    """
+    for attempt in range(max_attempts):
+        try:
+            return fn()
+        except (ClientError,) + RETRYABLE_EXCEPTIONS as e:
+            code = error_code(e) or type(e).__name__
+            retryable = isinstance(e, RETRYABLE_EXCEPTIONS) or code in RETRYABLE_ERRORS
+            if not retryable or attempt == max_attempts - 1:
+                raise
+            delay = random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+            if deadline is not None and time.monotonic() + delay >= deadline:
+                print(f"{code} on attempt {attempt + 1}, no time left to retry")
+                raise
+            print(f"{code} on attempt {attempt + 1}, retrying in {delay:.1f}s")
+            time.sleep(delay)
+
+
+class TokenBucket:
+    """Per-container rate limiter refilled continuously at rate_per_minute."""
+
+    def __init__(self, rate_per_minute):
+        self.capacity = float(rate_per_minute)
+        self.tokens = self.capacity
+        self.rate = self.capacity / 60.0
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, amount=1):
+        """Block until amount tokens are available; returns seconds waited."""
+        amount = min(float(amount), self.capacity)
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return waited
+                delay = (amount - self.tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+class DynamoSemaphore:
+    """Cross-container concurrency cap kept as one lease item per slot in DynamoDB.
+
+    Each holder writes its own SLOT#n item under SEMAPHORE#{name} with a lease
+    expiry. A lease not released within lease_seconds (a crashed holder) is free
+    to take over at once, and the ttl attribute lets DynamoDB delete it later.
+    Slots are tracked per thread, so one instance can be shared by threads.
+    """
+
+    def __init__(self, table_name, name, limit, lease_seconds=300, timeout=120):
+        self.table = dynamodb.Table(table_name)
+        self.pk = f"SEMAPHORE#{name}"
+        self.limit = limit
+        self.lease_seconds = lease_seconds
+        self.timeout = timeout
+        self._held = threading.local()
+
+    def _free_slots(self, now):
+        resp = self.table.query(
+            KeyConditionExpression=Key("PK").eq(self.pk) & Key("SK").begins_with("SLOT#"),
+            ConsistentRead=True,
+        )
+        taken = {item["SK"] for item in resp.get("Items", []) if item.get("expiresAt", 0) >= now}
+        free = [f"SLOT#{n}" for n in range(self.limit) if f"SLOT#{n}" not in taken]
+        random.shuffle(free)  # spread concurrent acquirers over different slots
+        return free
+
+    def _try_acquire(self, holder):
+        now = int(time.time())
+        for slot in self._free_slots(now):
+            try:
+                self.table.put_item(
+                    Item={
+                        "PK": self.pk,
+                        "SK": slot,
+                        "holder": holder,
+                        "expiresAt": now + self.lease_seconds,
+                        "ttl": now + self.lease_seconds,
+                    },
+                    ConditionExpression="attribute_not_exists(PK) OR expiresAt < :now",
+                    ExpressionAttributeValues={":now": now},
+                )
+                return slot
+            except ClientError as e:
+                if error_code(e) != "ConditionalCheckFailedException":
+                    raise
+        return None
+
+    def acquire(self, deadline=None):
+        """Take a slot, raising TimeoutError after timeout seconds or at deadline (time.monotonic())."""
+        holder = uuid.uuid4().hex
+        give_up = time.monotonic() + self.timeout
+        if deadline is not None:
+            give_up = min(give_up, deadline)
+        attempt = 0
+        while True:
+            slot = self._try_acquire(holder)
+            if slot is not None:
+                self._held.lease = (slot, holder)
+                return
+            if time.monotonic() > give_up:
+                raise TimeoutError(f"No free slot in {self.pk}")
+            time.sleep(random.uniform(0.5, 0.5 * (2 ** attempt)))
+            attempt = min(attempt + 1, 3)  # back off up to ~4s between polls
+
+    def release(self):
+        lease = getattr(self._held, "lease", None)
+        if lease is None:
+            return
+        self._held.lease = None
+        slot, holder = lease
+        try:
+            self.table.delete_item(
+                Key={"PK": self.pk, "SK": slot},
+                ConditionExpression="holder = :holder",
+                ExpressionAttributeValues={":holder": holder},
+            )
+        except ClientError as e:
+            # The lease expired and another holder has taken the slot over
+            if error_code(e) != "ConditionalCheckFailedException":
+                raise
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.release()
+        return False
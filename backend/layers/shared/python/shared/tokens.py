@@ -0,0 +1,8 @@
+CHARS_PER_TOKEN = 3.5  # Anthropic's rule of thumb for English prose; errs towards overestimating
+
+
+def estimate_tokens(text):
+    """Approximate Claude token count without a tokenizer dependency."""
+    if not text:
+        return 0
+    return max(1, int(len(text) / CHARS_PER_TOKEN + 0.5))
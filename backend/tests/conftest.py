@@ -0,0 +1,26 @@
+import os
+import sys
+
+SHARED_LAYER = os.path.join(os.path.dirname(__file__), "..", "layers", "shared", "python")
+sys.path.insert(0, os.path.abspath(SHARED_LAYER))
+
+# The shared modules create boto3 clients and read table names at import time
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+for name in ("INTERVIEWS_TABLE", "USERS_TABLE", "AUDIT_TABLE", "INSIGHTS_TABLE", "CONSENT_TABLE"):
+    os.environ.setdefault(name, f"test-{name.lower()}")
+
+FUNCTIONS_DIR = os.path.join(os.path.dirname(__file__), "..", "functions")
+
+
+def load_function(name):
+    """Import functions/<name>/app.py under a unique module name (every handler module is app.py)."""
+    import importlib.util
+
+    module_name = f"{name}_app"
+    if module_name in sys.modules:
+        return sys.modules[module_name]
+    spec = importlib.util.spec_from_file_location(module_name, os.path.join(FUNCTIONS_DIR, name, "app.py"))
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[module_name] = module
+    spec.loader.exec_module(module)
+    return module
@@ -0,0 +1,69 @@
+import threading
+
+from shared import audit as audit_module
+from shared.audit import AuditLogger
+
+PAGE_SIZE = 2
+
+
+class FakeAuditTable:
+    """put_item/query over an in-memory table; query returns PAGE_SIZE items per page."""
+
+    def __init__(self):
+        self.items = []
+        self.queried = []
+        self.lock = threading.Lock()
+
+    def put_item(self, Item):
+        with self.lock:
+            self.items.append(dict(Item))
+
+    def query(self, KeyConditionExpression, ExclusiveStartKey=None):
+        partition = KeyConditionExpression.get_expression()["values"][1]
+        with self.lock:
+            self.queried.append(partition)
+            matching = sorted((i for i in self.items if i["PK"] == partition), key=lambda i: i["SK"])
+        start = 0
+        if ExclusiveStartKey:
+            start = [i["SK"] for i in matching].index(ExclusiveStartKey["SK"]) + 1
+        page = matching[start:start + PAGE_SIZE]
+        resp = {"Items": page}
+        if start + PAGE_SIZE < len(matching):
+            resp["LastEvaluatedKey"] = {"PK": partition, "SK": page[-1]["SK"]}
+        return resp
+
+
+def make_logger():
+    logger = AuditLogger()
+    logger.table = FakeAuditTable()
+    return logger
+
+
+def test_events_are_spread_over_all_shards():
+    logger = make_logger()
+    for n in range(200):
+        logger.log("user", "VIEW", f"session-{n}")
+    date_str = logger.table.items[0]["PK"].split("#")[1]
+    partitions = {item["PK"] for item in logger.table.items}
+    assert partitions == {f"AUDIT#{date_str}#{i}" for i in range(audit_module.AUDIT_SHARD_COUNT)}
+
+
+def test_query_day_merges_every_shard_and_the_legacy_partition():
+    logger = make_logger()
+    event_ids = [logger.log("user", "VIEW", f"session-{n}") for n in range(50)]
+    date_str = logger.table.items[0]["PK"].split("#")[1]
+    legacy = {"PK": f"AUDIT#{date_str}", "SK": f"EVENT#{date_str}T00:00:00+00:00#legacy", "action": "OLD"}
+    logger.table.put_item(Item=legacy)
+
+    events = logger.query_day(date_str)
+
+    assert [e["SK"] for e in events] == sorted(event_ids + [legacy["SK"]])
+    expected = {f"AUDIT#{date_str}"} | {f"AUDIT#{date_str}#{i}" for i in range(audit_module.AUDIT_SHARD_COUNT)}
+    assert set(logger.table.queried) >= expected
+
+
+def test_query_day_ignores_other_days():
+    logger = make_logger()
+    logger.log("user", "VIEW", "session")
+    logger.table.put_item(Item={"PK": "AUDIT#2001-01-01#0", "SK": "EVENT#2001-01-01T00:00:00+00:00#x"})
+    assert logger.query_day("2001-01-01") == [{"PK": "AUDIT#2001-01-01#0", "SK": "EVENT#2001-01-01T00:00:00+00:00#x"}]
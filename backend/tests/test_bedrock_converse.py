@@ -0,0 +1,162 @@
+import io
+import json
+
+import pytest
+from botocore.exceptions import ClientError
+
+from shared import bedrock_client
+
+MODEL = "anthropic.claude-3-7-sonnet-test"
+
+
+class FakeBedrock:
+    """bedrock-runtime stand-in recording every call; reject makes Converse fail validation."""
+
+    def __init__(self, reject=False):
+        self.reject = reject
+        self.calls = []
+
+    def _validate(self, operation):
+        if self.reject:
+            raise ClientError({"Error": {"Code": "ValidationException", "Message": "no caching"}}, operation)
+
+    def converse(self, **kwargs):
+        self.calls.append(("converse", kwargs))
+        self._validate("Converse")
+        return {
+            "output": {"message": {"content": [{"text": '{"intervieweeQuestions": [{"id": "q1"}]}'}]}},
+            "usage": {"inputTokens": 50, "outputTokens": 20, "cacheReadInputTokens": 900, "cacheWriteInputTokens": 0},
+        }
+
+    def converse_stream(self, **kwargs):
+        self.calls.append(("converse_stream", kwargs))
+        self._validate("ConverseStream")
+        return {"stream": [
+            {"messageStart": {"role": "assistant"}},
+            {"contentBlockDelta": {"delta": {"text": '{"title": "x", '}}},
+            {"contentBlockDelta": {"delta": {"text": '"page1_companyContext": {"a": 1}}'}}},
+            {"messageStop": {"stopReason": "end_turn"}},
+            {"metadata": {"usage": {"inputTokens": 10, "outputTokens": 5, "cacheWriteInputTokens": 1200}}},
+        ]}
+
+    def invoke_model(self, **kwargs):
+        self.calls.append(("invoke_model", json.loads(kwargs["body"])))
+        body = {"content": [{"text": '{"questionMenu": [{"id": "q1"}]}'}], "usage": {"input_tokens": 10, "output_tokens": 5}}
+        return {"body": io.BytesIO(json.dumps(body).encode())}
+
+    def invoke_model_with_response_stream(self, **kwargs):
+        self.calls.append(("invoke_model_with_response_stream", json.loads(kwargs["body"])))
+        event = {"type": "content_block_delta", "delta": {"type": "text_delta", "text": '{"page1_companyContext": {"b": 2}}'}}
+        return {"body": [{"chunk": {"bytes": json.dumps(event).encode()}}]}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(bedrock_client, "_converse_unsupported", set())
+    client = bedrock_client.BedrockClient(model_id=MODEL)
+    client.cache = None
+    client.routes = {}
+    return client
+
+
+def use_fake(monkeypatch, reject=False):
+    fake = FakeBedrock(reject)
+    monkeypatch.setattr(bedrock_client, "bedrock", fake)
+    return fake
+
+
+def test_short_static_prefix_sends_no_cache_point(client, monkeypatch):
+    fake = use_fake(monkeypatch)
+    assert client.generate_questions("Acme", {"companyOverview": "x"}) == {"intervieweeQuestions": [{"id": "q1"}]}
+
+    (operation, request), = fake.calls
+    assert operation == "converse"
+    assert request["modelId"] == MODEL
+    assert request["system"] == [{"text": bedrock_client.QUESTION_SYSTEM_PROMPT}]
+    (content,) = request["messages"][0]["content"]
+    assert content["text"].startswith("Generate interview questions for: Acme")
+    assert content["text"].endswith(bedrock_client.QUESTIONS_SCHEMA)
+    assert client.usage.as_dict()["inputTokens"] == 50
+
+
+def test_long_enough_prefix_gets_one_cache_point(client, monkeypatch):
+    fake = use_fake(monkeypatch)
+    monkeypatch.setattr(bedrock_client, "DEFAULT_CACHE_MIN_TOKENS", 100)
+    client.generate_questions("Acme", {"companyOverview": "x"})
+
+    (_, request), = fake.calls
+    assert request["system"] == [
+        {"text": bedrock_client.QUESTION_SYSTEM_PROMPT},
+        {"text": bedrock_client.QUESTIONS_SCHEMA},
+        bedrock_client.CACHE_POINT,
+    ]
+    (content,) = request["messages"][0]["content"]
+    assert bedrock_client.QUESTIONS_SCHEMA not in content["text"]
+
+
+def test_haiku_needs_a_longer_prefix():
+    assert bedrock_client.cache_min_tokens("anthropic.claude-3-5-haiku-20241022-v1:0") == 2048
+    assert bedrock_client.cache_min_tokens("anthropic.claude-3-7-sonnet-20250219-v1:0") == 1024
+
+
+def test_converse_stream_feeds_sections(client, monkeypatch):
+    fake = use_fake(monkeypatch)
+    sections = []
+    brief = client.generate_interviewer_brief("Acme", {}, [], on_section=lambda key, value: sections.append(key))
+
+    assert brief == {"title": "x", "page1_companyContext": {"a": 1}}
+    assert sections == ["title", "page1_companyContext"]
+    assert [operation for operation, _ in fake.calls] == ["converse_stream"]
+    assert client.usage.as_dict()["outputTokens"] == 5
+
+
+def test_stage_opted_out_of_converse_uses_invoke_model(client, monkeypatch):
+    fake = use_fake(monkeypatch)
+    client.converse_stages.discard("generate_interviewee_packet")
+    client.generate_interviewee_packet("Acme", {}, [])
+    client.generate_questions("Acme", {})
+    assert [operation for operation, _ in fake.calls] == ["invoke_model", "converse"]
+
+
+def test_validation_exception_falls_back_to_invoke_model(client, monkeypatch):
+    fake = use_fake(monkeypatch, reject=True)
+    assert client.generate_interviewee_packet("Acme", {}, []) == {"questionMenu": [{"id": "q1"}]}
+    assert [operation for operation, _ in fake.calls] == ["converse", "invoke_model"]
+    assert MODEL in bedrock_client._converse_unsupported
+
+    # The model is remembered as unsupported: later calls skip Converse entirely
+    fake.calls.clear()
+    brief = client.generate_interviewer_brief("Acme", {}, [], on_section=lambda key, value: None)
+    assert brief == {"page1_companyContext": {"b": 2}}
+    assert [operation for operation, _ in fake.calls] == ["invoke_model_with_response_stream"]
+
+
+def test_stream_validation_exception_falls_back(client, monkeypatch):
+    fake = use_fake(monkeypatch, reject=True)
+    brief = client.generate_interviewer_brief("Acme", {}, [], on_section=lambda key, value: None)
+    assert brief == {"page1_companyContext": {"b": 2}}
+    assert [operation for operation, _ in fake.calls] == ["converse_stream", "invoke_model_with_response_stream"]
+
+
+def test_unrelated_validation_error_does_not_disable_converse(client, monkeypatch):
+    fake = use_fake(monkeypatch)
+
+    def too_long(**kwargs):
+        raise ClientError({"Error": {"Code": "ValidationException", "Message": "Input is too long for requested model."}}, "Converse")
+
+    fake.converse = too_long
+    with pytest.raises(ClientError):
+        client.generate_questions("Acme", {})
+    assert MODEL not in bedrock_client._converse_unsupported
+
+
+def test_other_converse_errors_are_raised(client, monkeypatch):
+    fake = use_fake(monkeypatch)
+
+    def denied(**kwargs):
+        raise ClientError({"Error": {"Code": "AccessDeniedException", "Message": "denied"}}, "Converse")
+
+    fake.converse = denied
+    with pytest.raises(ClientError):
+        client.generate_questions("Acme", {})
+    assert MODEL not in bedrock_client._converse_unsupported
@@ -0,0 +1,92 @@
+import io
+import json
+
+import pytest
+from botocore.exceptions import ClientError
+
+from shared import bedrock_client
+
+STRONG_MODEL = "anthropic.claude-3-5-sonnet-strong"
+FAST_MODEL = "anthropic.claude-3-haiku-fast"
+
+
+class FakeInvokeBedrock:
+    """bedrock-runtime stand-in without Converse: replies are served in order."""
+
+    def __init__(self, replies):
+        self.replies = list(replies)
+        self.models = []
+
+    def invoke_model(self, **kwargs):
+        self.models.append(kwargs["modelId"])
+        if isinstance(self.replies[0], Exception):
+            raise self.replies.pop(0)
+        body = {"content": [{"text": self.replies.pop(0)}], "usage": {"input_tokens": 10, "output_tokens": 5}}
+        return {"body": io.BytesIO(json.dumps(body).encode())}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(bedrock_client, "_unavailable_models", set())
+    client = bedrock_client.BedrockClient(model_id=STRONG_MODEL)
+    client.cache = None
+    client.routes = {"generate_interviewee_packet": FAST_MODEL}
+    return client
+
+
+def use_fake(monkeypatch, replies):
+    fake = FakeInvokeBedrock(replies)
+    monkeypatch.setattr(bedrock_client, "bedrock", fake)
+    return fake
+
+
+def test_complete_fast_answer_is_kept(client, monkeypatch):
+    fake = use_fake(monkeypatch, ['{"questionMenu": [{"id": "q1"}]}'])
+    assert client.generate_interviewee_packet("Acme", {}, []) == {"questionMenu": [{"id": "q1"}]}
+    assert fake.models == [FAST_MODEL]
+
+
+def test_unparseable_fast_answer_is_rerouted(client, monkeypatch):
+    fake = use_fake(monkeypatch, ["Sorry, I cannot help with that.", '{"questionMenu": [{"id": "q1"}]}'])
+    assert client.generate_interviewee_packet("Acme", {}, []) == {"questionMenu": [{"id": "q1"}]}
+    assert fake.models == [FAST_MODEL, STRONG_MODEL]
+
+
+def test_truncated_fast_answer_is_rerouted(client, monkeypatch):
+    fake = use_fake(monkeypatch, [
+        '{"questionMenu": [{"id": "q1"}, {"id": "q2", "question": "What dri',
+        '{"questionMenu": [{"id": "q1"}, {"id": "q2"}]}',
+    ])
+    assert client.generate_interviewee_packet("Acme", {}, []) == {"questionMenu": [{"id": "q1"}, {"id": "q2"}]}
+    assert fake.models == [FAST_MODEL, STRONG_MODEL]
+
+
+def test_truncated_strong_answer_is_repaired(client, monkeypatch):
+    client.prefer_strong = True
+    fake = use_fake(monkeypatch, ['{"questionMenu": [{"id": "q1"}, {"id": "q2", "question": "What dri'])
+    value = client.generate_interviewee_packet("Acme", {}, [])
+    assert value == {"questionMenu": [{"id": "q1"}, {"id": "q2", "question": "What dri"}]}
+    assert fake.models == [STRONG_MODEL]
+
+
+def test_fast_model_without_access_falls_back_and_is_skipped_afterwards(client, monkeypatch):
+    denied = ClientError({"Error": {"Code": "AccessDeniedException", "Message": "no model access"}}, "InvokeModel")
+    fake = use_fake(monkeypatch, [denied, '{"questionMenu": [1]}', '{"questionMenu": [2]}'])
+    assert client.generate_interviewee_packet("Acme", {}, []) == {"questionMenu": [1]}
+    assert client.generate_interviewee_packet("Acme", {"companyOverview": "y"}, []) == {"questionMenu": [2]}
+    assert fake.models == [FAST_MODEL, STRONG_MODEL, STRONG_MODEL]
+
+
+def test_other_fast_model_client_error_falls_back_once(client, monkeypatch):
+    invalid = ClientError({"Error": {"Code": "ValidationException", "Message": "bad input"}}, "InvokeModel")
+    fake = use_fake(monkeypatch, [invalid, '{"questionMenu": [1]}', '{"questionMenu": [2]}'])
+    assert client.generate_interviewee_packet("Acme", {}, []) == {"questionMenu": [1]}
+    assert client.generate_interviewee_packet("Acme", {"companyOverview": "y"}, []) == {"questionMenu": [2]}
+    assert fake.models == [FAST_MODEL, STRONG_MODEL, FAST_MODEL]
+
+
+def test_strong_model_client_error_is_raised(client, monkeypatch):
+    denied = ClientError({"Error": {"Code": "AccessDeniedException", "Message": "no model access"}}, "InvokeModel")
+    use_fake(monkeypatch, [denied])
+    with pytest.raises(ClientError):
+        client.generate_interviewer_brief("Acme", {}, [])
@@ -0,0 +1,80 @@
+import random
+
+import pytest
+
+from conftest import load_function
+
+ingest = load_function("ingest_sources")
+
+
+def prose(seed, paragraphs=40):
+    rng = random.Random(seed)
+    words = ["alpha", "revenue", "Texas", "freight", "margin", "customers", "growth", "pricing", "x" * 12]
+    out = []
+    for _ in range(paragraphs):
+        sentences = [
+            " ".join(rng.choice(words) for _ in range(rng.randint(3, 40))).capitalize() + rng.choice(".!?")
+            for _ in range(rng.randint(1, 9))
+        ]
+        out.append(" ".join(sentences))
+    return "\n\n".join(out)
+
+
+def offsets(text, chunks):
+    """(start, end) of each chunk within text; chunks are slices, so each is found in order."""
+    found = []
+    pos = 0
+    for chunk in chunks:
+        start = text.index(chunk["text"], pos)
+        found.append((start, start + len(chunk["text"])))
+        pos = start + 1
+    return found
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("max_tokens,overlap", [(800, 100), (120, 30), (60, 0)])
+def test_chunks_fit_budget_cover_text_and_end_on_sentences(seed, max_tokens, overlap):
+    text = prose(seed)
+    chunks = ingest.chunk_documents([{"text": text, "source": "doc"}], max_tokens, overlap)
+    max_chars = int(max_tokens * ingest.CHARS_PER_TOKEN)
+    sentence_ends = {end for _, end in ingest._sentence_spans(text, max_chars)}
+
+    assert all(c["source"] == "doc" and 0 < c["tokens"] <= max_tokens for c in chunks)
+    assert all(c["tokens"] == ingest.estimate_tokens(c["text"]) for c in chunks)
+    spans = offsets(text, chunks)
+    assert all(end in sentence_ends for _, end in spans)
+    assert spans[0][0] == 0 and spans[-1][1] == len(text.rstrip())
+    for (_, prev_end), (start, _) in zip(spans, spans[1:]):
+        assert start <= prev_end or not text[prev_end:start].strip()  # nothing between chunks is dropped
+
+
+def test_overlap_carries_trailing_sentences():
+    text = " ".join(f"Sentence number {n} is here." for n in range(200))
+    chunks = ingest.chunk_documents([{"text": text, "source": "s"}], max_tokens=100, overlap_tokens=20)
+    spans = offsets(text, chunks)
+    assert len(chunks) > 5
+    for (_, prev_end), (start, _) in zip(spans, spans[1:]):
+        assert 0 < prev_end - start <= 20 * ingest.CHARS_PER_TOKEN
+
+
+def test_prefers_paragraph_breaks_past_half_budget():
+    paragraph = " ".join(["Short sentence here."] * 12)  # ~240 chars, ~69 tokens
+    text = "\n\n".join([paragraph] * 6)
+    chunks = ingest.chunk_documents([{"text": text, "source": "s"}], max_tokens=120, overlap_tokens=20)
+    assert [c["text"] for c in chunks] == [paragraph] * 6
+
+
+def test_long_sentence_is_cut_at_whitespace():
+    text = " ".join(["word"] * 2000) + "."
+    chunks = ingest.chunk_documents([{"text": text, "source": "s"}], max_tokens=100, overlap_tokens=0)
+    assert len(chunks) > 1
+    assert all(c["tokens"] <= 100 for c in chunks)
+    assert "".join(c["text"].replace(" ", "") for c in chunks) == text.replace(" ", "")
+
+
+def test_chunks_never_span_documents():
+    docs = [{"text": prose(1, 3), "source": "a"}, {"text": "", "source": "empty"}, {"text": prose(2, 3), "source": "b"}]
+    chunks = ingest.chunk_documents(docs, max_tokens=80, overlap_tokens=10)
+    assert {c["source"] for c in chunks} == {"a", "b"}
+    for chunk in chunks:
+        assert chunk["text"] in next(d["text"] for d in docs if d["source"] == chunk["source"])
@@ -0,0 +1,110 @@
+import pytest
+
+from conftest import load_function
+from shared.cache import TieredCache
+
+ingest = load_function("ingest_sources")
+
+
+class CountingS3:
+    """S3Client stand-in for the cache tier that counts reads and writes."""
+
+    def __init__(self):
+        self.objects = {}
+        self.gets = 0
+        self.puts = 0
+
+    def get_json(self, key):
+        self.gets += 1
+        return self.objects[key]
+
+    def upload_json(self, key, data):
+        self.puts += 1
+        self.objects[key] = data
+
+
+class FakeComprehend:
+    def __init__(self):
+        self.calls = {}
+
+    def _record(self, operation, texts):
+        assert len(texts) <= ingest.COMPREHEND_BATCH_SIZE
+        self.calls[operation] = self.calls.get(operation, 0) + 1
+
+    def batch_detect_entities(self, TextList, LanguageCode):
+        self._record("entities", TextList)
+        return {"ResultList": [
+            {"Index": i, "Entities": [{"Text": text.split()[0], "Type": "ORGANIZATION", "Score": 0.99}]}
+            for i, text in enumerate(TextList)
+        ], "ErrorList": []}
+
+    def batch_detect_key_phrases(self, TextList, LanguageCode):
+        self._record("key_phrases", TextList)
+        return {"ResultList": [
+            {"Index": i, "KeyPhrases": [{"Text": "supply chain", "Score": 0.95}]} for i in range(len(TextList))
+        ], "ErrorList": []}
+
+
+@pytest.fixture
+def comprehend(monkeypatch):
+    fake = FakeComprehend()
+    monkeypatch.setattr(ingest, "comprehend", fake)
+    monkeypatch.setitem(ingest.comprehend_stats, "calls", 0)
+    return fake
+
+
+def fresh_cache(monkeypatch, s3):
+    # A new in-memory tier over the same S3 objects, as in a cold container
+    cache = TieredCache("cache/comprehend", 3600, s3_client=s3)
+    monkeypatch.setattr(ingest, "comprehend_cache", cache)
+    return cache
+
+
+SEGMENTS = [f"Company{n} ships freight across Texas every week." for n in range(60)]
+
+
+def test_segments_are_sent_in_batches_of_25(comprehend, monkeypatch):
+    fresh_cache(monkeypatch, CountingS3())
+    entities = ingest.extract_entities(SEGMENTS)
+    phrases = ingest.extract_key_phrases(SEGMENTS)
+
+    assert comprehend.calls == {"entities": 3, "key_phrases": 3}
+    assert ingest.comprehend_stats["calls"] == 6
+    assert [e["text"] for e in entities] == [f"Company{n}" for n in range(60)]
+    assert phrases == ["supply chain"]
+
+
+def test_cache_costs_one_s3_read_and_write_per_batch(comprehend, monkeypatch):
+    s3 = CountingS3()
+    fresh_cache(monkeypatch, s3)
+    first = ingest.extract_entities(SEGMENTS)
+    assert (s3.gets, s3.puts) == (3, 3)
+
+    fresh_cache(monkeypatch, s3)
+    comprehend.calls.clear()
+    assert ingest.extract_entities(SEGMENTS) == first
+    assert comprehend.calls == {}
+    assert (s3.gets, s3.puts) == (6, 3)
+
+
+def test_batch_with_errors_is_not_cached(comprehend, monkeypatch):
+    s3 = CountingS3()
+    fresh_cache(monkeypatch, s3)
+    detect = comprehend.batch_detect_entities
+
+    def partly_failing(TextList, LanguageCode):
+        resp = detect(TextList, LanguageCode)
+        resp["ResultList"] = resp["ResultList"][1:]
+        resp["ErrorList"] = [{"Index": 0, "ErrorCode": "INTERNAL_SERVER_ERROR", "ErrorMessage": "boom"}]
+        return resp
+
+    monkeypatch.setattr(comprehend, "batch_detect_entities", partly_failing)
+    results = ingest._detect_batched("batch_detect_entities", SEGMENTS[:3], ingest._parse_entities)
+    assert results[0] is None and results[1] and results[2]
+    assert s3.puts == 0
+
+
+def test_no_segments_makes_no_calls(comprehend, monkeypatch):
+    fresh_cache(monkeypatch, CountingS3())
+    assert ingest.extract_entities([]) == []
+    assert comprehend.calls == {}
@@ -0,0 +1,99 @@
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from conftest import load_function
+from shared.cache import TieredCache
+
+ingest = load_function("ingest_sources")
+
+
+class DelayedPageHandler(BaseHTTPRequestHandler):
+    """Serves /<delay ms>/<name> as an HTML page containing name, after the delay."""
+
+    def do_GET(self):
+        _, delay_ms, name = self.path.split("/")
+        time.sleep(int(delay_ms) / 1000)
+        body = f"<html><body><p>page {name}</p></body></html>".encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class EmptyS3:
+    def get_json(self, key):
+        raise KeyError(key)
+
+    def upload_json(self, key, data):
+        pass
+
+
+class FakeLambdaContext:
+    def __init__(self, remaining_ms):
+        self.remaining_ms = remaining_ms
+
+    def get_remaining_time_in_millis(self):
+        return self.remaining_ms
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), DelayedPageHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(autouse=True)
+def isolated(monkeypatch):
+    # Not restored: a fetch abandoned at the deadline may still write to the cache later
+    ingest.page_cache = TieredCache("cache/pages", 3600, s3_client=EmptyS3())
+    monkeypatch.setattr(ingest, "_host_locks", {})
+    monkeypatch.setattr(ingest, "MAX_REQUESTS_PER_HOST", 8)
+
+
+def timed_fetch(urls, context=None):
+    started = time.monotonic()
+    results = ingest.fetch_sources(urls, context)
+    return results, time.monotonic() - started
+
+
+def test_total_time_tracks_the_slowest_url(server):
+    delays = [600, 100, 300, 200, 50]
+    urls = [f"{server}/{delay}/{n}" for n, delay in enumerate(delays)]
+    results, elapsed = timed_fetch(urls)
+
+    assert [text for text, _ in results] == [f"page {n}" for n in range(len(delays))]
+    assert [status for _, status in results] == ["miss"] * len(delays)
+    assert 0.6 <= elapsed < 0.6 + 0.5  # far below the 1.25s sequential total
+
+
+def test_per_host_cap_serializes_requests(server, monkeypatch):
+    monkeypatch.setattr(ingest, "MAX_REQUESTS_PER_HOST", 1)
+    results, elapsed = timed_fetch([f"{server}/200/{n}" for n in range(3)])
+    assert [text for text, _ in results] == ["page 0", "page 1", "page 2"]
+    assert elapsed >= 0.6
+
+
+def test_deadline_reports_unfinished_urls_as_none(server):
+    context = FakeLambdaContext(ingest.DEADLINE_SAFETY_MARGIN_MS + 500)  # deadline clamps to 1s
+    results, elapsed = timed_fetch([f"{server}/50/fast", f"{server}/2000/slow", f"{server}/100/other"], context)
+
+    assert results[0] == ("page fast", "miss")
+    assert results[1] is None
+    assert results[2] == ("page other", "miss")
+    assert 1.0 <= elapsed < 2.0
+
+
+def test_no_urls():
+    assert ingest.fetch_sources([]) == []
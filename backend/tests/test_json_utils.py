@@ -0,0 +1,52 @@
+import json
+
+import pytest
+
+from shared.json_utils import extract_json
+
+BRIEF = json.dumps({
+    "title": "Brief",
+    "page1": {"whatWeThinkWeKnow": [
+        {"assertion": "They sell {widgets}", "confidence": "High"},
+        {"assertion": "B \"q\"", "confidence": "Low"},
+    ]},
+    "page2": {"qs": [1, 2.5, True, None]},
+}, indent=2)
+
+# Malformed model responses seen in practice: raw text -> (expected value, complete)
+CORPUS = {
+    "clean": (BRIEF, json.loads(BRIEF), True),
+    "preamble with braces": ("Here is the {requested} JSON:\n" + BRIEF, json.loads(BRIEF), True),
+    "trailing prose with braces": (BRIEF + "\n\nI used {placeholders} where unknown.", json.loads(BRIEF), True),
+    "code fence": ("```json\n" + BRIEF + "\n```", json.loads(BRIEF), True),
+    "array": ('Sure: [1, 2, {"a": [3]}] done', [1, 2, {"a": [3]}], True),
+    "bad value before good one": ('{"a": ] garbage} {"ok": 1}', {"ok": 1}, True),
+    "truncated number": ('{"a": [1, 2.5', {"a": [1, 2.5]}, False),
+    "truncated after colon": ('{"a": 1, "b":', {"a": 1}, False),
+    "truncated literal": ('{"a": {"b": 1, "c": tru', {"a": {"b": 1}}, False),
+    "preamble then truncated literal": (
+        'Here is the JSON you asked for: {"a": {"b": 1, "c": tru', {"a": {"b": 1}}, False,
+    ),
+    "preamble then truncated string": (
+        'Result follows. {"a": [1, 2], "b": "some te', {"a": [1, 2], "b": "some te"}, False,
+    ),
+    "prose braces then truncated array": ('Sure {not json} then [1, 2, {"x": "abc', [1, 2, {"x": "abc"}], False),
+}
+
+
+@pytest.mark.parametrize("raw,expected,complete", CORPUS.values(), ids=list(CORPUS))
+def test_extract_json_corpus(raw, expected, complete):
+    assert extract_json(raw) == (expected, complete)
+
+
+def test_truncated_after_comma_keeps_earlier_members():
+    raw = BRIEF[: BRIEF.index('"page2"')]
+    value, complete = extract_json(raw)
+    assert not complete
+    assert value == {k: v for k, v in json.loads(BRIEF).items() if k != "page2"}
+
+
+@pytest.mark.parametrize("raw", ["I cannot help with that.", ""])
+def test_extract_json_without_json_raises(raw):
+    with pytest.raises(ValueError):
+        extract_json(raw)
@@ -0,0 +1,39 @@
+import json
+
+from conftest import load_function
+
+PAGE_SIZE = 2
+
+
+class FakeIndexTable:
+    """GSI1 query over in-memory sessions; PAGE_SIZE items per page, projection and Limit ignored."""
+
+    def __init__(self, items):
+        self.items = items
+
+    def query(self, KeyConditionExpression, ExclusiveStartKey=None, **kwargs):
+        partition = KeyConditionExpression.get_expression()["values"][1]
+        matching = [i for i in self.items if i["GSI1PK"] == partition]
+        start = ExclusiveStartKey["offset"] if ExclusiveStartKey else 0
+        resp = {"Items": [dict(i) for i in matching[start:start + PAGE_SIZE]]}
+        if start + PAGE_SIZE < len(matching):
+            resp["LastEvaluatedKey"] = {"offset": start + PAGE_SIZE}
+        return resp
+
+
+def session(n, status, user="u1"):
+    return {
+        "PK": f"INTERVIEW#{n}", "SK": "META", "GSI1PK": f"USER#{user}", "GSI1SK": f"INTERVIEW#{n}",
+        "sessionId": str(n), "status": status,
+    }
+
+
+def test_status_counts_cover_all_pages(monkeypatch):
+    app = load_function("list_sessions")
+    items = [session(n, "completed") for n in range(3)] + [session(3, "generating"), session(4, "completed", "u2")]
+    monkeypatch.setattr(app.db, "interviews", FakeIndexTable(items))
+    event = {"requestContext": {"authorizer": {"claims": {"sub": "u1"}}}, "queryStringParameters": {"limit": "1"}}
+
+    body = json.loads(app.handler(event, None)["body"])
+    assert len(body["sessions"]) == 1
+    assert body["statusCounts"] == {"completed": 3, "generating": 1}
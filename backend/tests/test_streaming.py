@@ -0,0 +1,85 @@
+import json
+
+import pytest
+
+from shared import bedrock_client
+from shared.json_utils import JsonSectionAssembler
+
+DOCUMENT = (
+    'Here you go:\n{"title": "Brief: {x}", "generatedAt": "now", '
+    '"page1_companyContext": {"a": [1, 2, {"b": "c\\"}"}]}, "n": 12, "t": true, "page3": {"z": null}} trailing {'
+)
+SECTIONS = [
+    ("title", "Brief: {x}"),
+    ("generatedAt", "now"),
+    ("page1_companyContext", {"a": [1, 2, {"b": 'c"}'}]}),
+    ("n", 12),
+    ("t", True),
+    ("page3", {"z": None}),
+]
+
+
+def chunks(text, size):
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+class FakeStreamingBedrock:
+    """invoke_model_with_response_stream replaying DOCUMENT as Anthropic event-stream chunks."""
+
+    def __init__(self, chunk_size=7):
+        self.chunk_size = chunk_size
+
+    def invoke_model_with_response_stream(self, **kwargs):
+        events = [{"type": "message_start", "message": {"usage": {"input_tokens": 40}}}]
+        events += [
+            {"type": "content_block_delta", "delta": {"type": "text_delta", "text": text}}
+            for text in chunks(DOCUMENT, self.chunk_size)
+        ]
+        events += [{"type": "message_delta", "usage": {"output_tokens": 60}}, {"type": "message_stop"}]
+        return {"body": [{"chunk": {"bytes": json.dumps(event).encode()}} for event in events]}
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(bedrock_client, "bedrock", FakeStreamingBedrock())
+    client = bedrock_client.BedrockClient()
+    client.cache = None
+    client.converse_stages = set()
+    return client
+
+
+@pytest.mark.parametrize("size", [1, 7, len(DOCUMENT)])
+def test_assembler_yields_sections_for_any_chunking(size):
+    assembler = JsonSectionAssembler()
+    sections = [section for text in chunks(DOCUMENT, size) for section in assembler.feed(text)]
+    assert sections == SECTIONS
+
+
+def test_invoke_stream_yields_text_deltas(client):
+    assert "".join(client.invoke_stream("system", "user")) == DOCUMENT
+
+
+def test_json_output_reports_sections_while_streaming(client):
+    sections = []
+    value = client.invoke_with_json_output("system", "user", on_section=lambda key, value: sections.append((key, value)))
+    assert sections == SECTIONS
+    assert value == dict(SECTIONS)
+    assert client.usage.as_dict()["inputTokens"] == 40
+    assert client.usage.as_dict()["outputTokens"] == 60
+
+
+class BrokenStreamingBedrock(FakeStreamingBedrock):
+    """Stream that fails after the first few deltas."""
+
+    def invoke_model_with_response_stream(self, **kwargs):
+        body = super().invoke_model_with_response_stream(**kwargs)["body"][:4]
+        body.append({"modelStreamErrorException": {"message": "stream broke"}})
+        return {"body": body}
+
+
+def test_broken_stream_still_records_usage(client, monkeypatch):
+    monkeypatch.setattr(bedrock_client, "bedrock", BrokenStreamingBedrock())
+    with pytest.raises(RuntimeError):
+        client.invoke("system", "user", on_delta=lambda text: None)
+    assert client.usage.as_dict()["calls"] == 1
+    assert client.usage.as_dict()["inputTokens"] == 40
@@ -0,0 +1,183 @@
+import io
+import json
+import threading
+
+import pytest
+from botocore.exceptions import ClientError, EndpointConnectionError, ReadTimeoutError
+
+from shared import bedrock_client, throttle
+
+
+def client_error(code, operation="InvokeModel"):
+    return ClientError({"Error": {"Code": code, "Message": code}}, operation)
+
+
+@pytest.fixture(autouse=True)
+def no_sleep(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(throttle.time, "sleep", sleeps.append)
+    return sleeps
+
+
+class ThrottlingBedrock:
+    """invoke_model fails with the given errors, in order, before answering."""
+
+    def __init__(self, errors):
+        self.errors = list(errors)
+        self.calls = 0
+
+    def invoke_model(self, **kwargs):
+        self.calls += 1
+        if self.errors:
+            raise self.errors.pop(0)
+        body = {"content": [{"text": '{"ok": true}'}], "usage": {"input_tokens": 10, "output_tokens": 5}}
+        return {"body": io.BytesIO(json.dumps(body).encode())}
+
+
+@pytest.fixture
+def client():
+    client = bedrock_client.BedrockClient()
+    client.cache = None
+    client.converse_stages = set()
+    return client
+
+
+def test_throttled_invoke_is_retried(client, monkeypatch, no_sleep):
+    fake = ThrottlingBedrock([client_error("ThrottlingException")] * 3)
+    monkeypatch.setattr(bedrock_client, "bedrock", fake)
+    assert client.invoke_with_json_output("system", "user") == {"ok": True}
+    assert fake.calls == 4
+    assert len(no_sleep) == 3
+
+
+def test_transient_server_and_network_errors_are_retried(client, monkeypatch):
+    fake = ThrottlingBedrock([
+        client_error("InternalServerException"),
+        EndpointConnectionError(endpoint_url="https://bedrock-runtime"),
+        ReadTimeoutError(endpoint_url="https://bedrock-runtime"),
+    ])
+    monkeypatch.setattr(bedrock_client, "bedrock", fake)
+    assert client.invoke_with_json_output("system", "user") == {"ok": True}
+    assert fake.calls == 4
+
+
+def test_persistent_throttling_gives_up(client, monkeypatch):
+    fake = ThrottlingBedrock([client_error("ThrottlingException")] * 10)
+    monkeypatch.setattr(bedrock_client, "bedrock", fake)
+    with pytest.raises(ClientError):
+        client.invoke("system", "user")
+    assert fake.calls == 6
+
+
+def test_non_retryable_error_is_raised_at_once():
+    calls = []
+
+    def fail():
+        calls.append(1)
+        raise client_error("AccessDeniedException")
+
+    with pytest.raises(ClientError):
+        throttle.call_with_backoff(fail)
+    assert len(calls) == 1
+
+
+class FakeContext:
+    def __init__(self, remaining_ms):
+        self.remaining_ms = remaining_ms
+
+    def get_remaining_time_in_millis(self):
+        return self.remaining_ms
+
+
+def test_retries_stop_at_lambda_deadline(client, monkeypatch, no_sleep):
+    fake = ThrottlingBedrock([client_error("ThrottlingException")] * 10)
+    monkeypatch.setattr(bedrock_client, "bedrock", fake)
+    client.start_session("s1", FakeContext(bedrock_client.BEDROCK_DEADLINE_RESERVE_SECONDS * 1000))
+    with pytest.raises(ClientError):
+        client.invoke("system", "user")
+    assert fake.calls == 1
+    assert no_sleep == []
+
+
+class FakeSemaphoreTable:
+    """Just enough of a DynamoDB table for DynamoSemaphore's slot items."""
+
+    def __init__(self):
+        self.items = {}
+        self.lock = threading.Lock()
+
+    def query(self, **kwargs):
+        with self.lock:
+            return {"Items": [dict(item) for item in self.items.values()]}
+
+    def put_item(self, Item, ConditionExpression, ExpressionAttributeValues):
+        with self.lock:
+            current = self.items.get(Item["SK"])
+            if current is not None and current["expiresAt"] >= ExpressionAttributeValues[":now"]:
+                raise client_error("ConditionalCheckFailedException", "PutItem")
+            self.items[Item["SK"]] = dict(Item)
+
+    def delete_item(self, Key, ConditionExpression, ExpressionAttributeValues):
+        with self.lock:
+            current = self.items.get(Key["SK"])
+            if current is None or current["holder"] != ExpressionAttributeValues[":holder"]:
+                raise client_error("ConditionalCheckFailedException", "DeleteItem")
+            del self.items[Key["SK"]]
+
+
+@pytest.fixture
+def semaphore():
+    semaphore = throttle.DynamoSemaphore("interviews", "bedrock", limit=2, lease_seconds=300, timeout=0)
+    semaphore.table = FakeSemaphoreTable()
+    return semaphore
+
+
+def hold(semaphore):
+    """Acquire on a separate thread, as concurrent holders do, and return its lease."""
+    leases = []
+
+    def run():
+        semaphore.acquire()
+        leases.append(semaphore._held.lease)
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    thread.join()
+    return leases[0] if leases else None
+
+
+def test_semaphore_caps_holders(semaphore):
+    assert hold(semaphore) and hold(semaphore)
+    with pytest.raises(TimeoutError):
+        semaphore.acquire()
+
+
+def test_semaphore_release_frees_only_own_slot(semaphore):
+    hold(semaphore)
+    with semaphore:
+        assert len(semaphore.table.items) == 2
+    assert len(semaphore.table.items) == 1
+    semaphore.release()  # nothing held by this thread any more
+    assert len(semaphore.table.items) == 1
+
+
+def test_semaphore_reclaims_expired_lease(semaphore):
+    leaked_slot, _ = hold(semaphore)
+    hold(semaphore)
+    semaphore.table.items[leaked_slot]["expiresAt"] -= 1000  # its holder crashed long ago
+    semaphore.acquire()
+    slot, holder = semaphore._held.lease
+    assert slot == leaked_slot
+    assert semaphore.table.items[slot]["holder"] == holder
+    assert semaphore.table.items[slot]["ttl"] == semaphore.table.items[slot]["expiresAt"]
+
+
+def test_full_semaphore_does_not_fail_the_call(client, semaphore, monkeypatch):
+    hold(semaphore)
+    hold(semaphore)
+    fake = ThrottlingBedrock([])
+    monkeypatch.setattr(bedrock_client, "bedrock", fake)
+    client.limiter = semaphore
+    assert client.invoke_with_json_output("system", "user") == {"ok": True}
+    assert fake.calls == 1
+    assert len(semaphore.table.items) == 2  # the other holders' slots are untouched
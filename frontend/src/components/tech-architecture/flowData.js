@@ -45,7 +45,7 @@ export const MAIN_FLOW_STEPS = [
     name: "Ingest",
     description: "Lambda fetches URL content (HTML → text), runs Comprehend (entities, key phrases) and Textract (PDF). Chunks text for LLM context.",
     inputs: "urls, hasPdf, sessionId, userId",
-    outputs: "chunks, entities, sources, keyPhrases; DynamoDB status 'ingested'",
+    outputs: "contextRef (S3 claim-check for ranked chunks, entities, keyPhrases), sources; DynamoDB status 'ingested'",
     services: ["Lambda", "Comprehend", "Textract", "S3", "DynamoDB"],
     failureBehavior: "Retry 3× (2s, backoff 2). Catch → IngestionFailed. Per-URL failures don't fail whole run if at least one source succeeds.",
   },
@@ -53,17 +53,17 @@ export const MAIN_FLOW_STEPS = [
     id: "generate-brief",
     name: "Generate Brief",
     description: "Lambda calls Bedrock 4×: company profile, questions (8), interviewer brief, interviewee packet. Writes artifacts to S3 and metadata to DynamoDB.",
-    inputs: "ingestionResult (chunks, entities, sources), companyName, urls",
-    outputs: "briefS3Key, packetS3Key, questions; S3 objects; DynamoDB brief record and status 'generated'",
+    inputs: "ingestionResult (contextRef, sources), companyName, urls",
+    outputs: "briefS3Key, packetS3Key, questionsRef; S3 objects; DynamoDB brief record and status 'generated'",
     services: ["Lambda", "Bedrock", "S3", "DynamoDB"],
     failureBehavior: "Retry 2× (5s, backoff 2). Catch → GenerationFailed. Bedrock throttling handled by retries.",
   },
   {
     id: "quality-check",
     name: "Quality Check",
-    description: "Lambda validates questions (no leading patterns, minimum count). If failed, Step Function invokes RegenerateBrief with qualityFeedback; else proceeds to BriefReady.",
-    inputs: "generationResult.questions, full state",
-    outputs: "passed (bool), issues (array), score",
+    description: "Lambda validates questions (no leading patterns, minimum count). If failed, Step Function invokes RegenerateBrief with qualityFeedback and failingQuestionIds, which rewrites only the failing questions; else proceeds to BriefReady.",
+    inputs: "generationResult.questionsRef, full state",
+    outputs: "passed (bool), issues (array), failingQuestionIds (array), score",
     services: ["Lambda", "Bedrock", "Step Functions"],
     failureBehavior: "Retry 2×. Catch → QualityCheckFailed. Choice state routes to RegenerateBrief or BriefReady.",
   },
@@ -27,6 +27,9 @@ const STATUS_CONFIG = {
 
 function Dashboard() {
   const [sessions, setSessions] = useState([]);
+  const [nextToken, setNextToken] = useState(null);
+  const [statusCounts, setStatusCounts] = useState({});
+  const [loadingMore, setLoadingMore] = useState(false);
   const [loading, setLoading] = useState(true);
   const [error, setError] = useState(null);
 
@@ -39,6 +42,8 @@ function Dashboard() {
       setLoading(true);
       const data = await api.listSessions();
       setSessions(data.sessions || []);
+      setNextToken(data.nextToken || null);
+      setStatusCounts(data.statusCounts || {});
     } catch (err) {
       setError(err.message);
     } finally {
@@ -46,15 +51,26 @@ function Dashboard() {
     }
   }
 
+  async function loadMoreSessions() {
+    try {
+      setLoadingMore(true);
+      const data = await api.listSessions({ nextToken });
+      setSessions((prev) => [...prev, ...(data.sessions || [])]);
+      setNextToken(data.nextToken || null);
+    } catch (err) {
+      setError(err.message);
+    } finally {
+      setLoadingMore(false);
+    }
+  }
+
+  // Counts come from the API so they cover sessions beyond the loaded pages
+  const countOf = (statuses) => statuses.reduce((sum, status) => sum + (statusCounts[status] || 0), 0);
   const stats = {
-    total: sessions.length,
-    active: sessions.filter((s) =>
-      ["generated", "ready", "packet_sent", "feedback_received", "updated"].includes(s.status)
-    ).length,
-    completed: sessions.filter((s) => s.status === "completed").length,
-    generating: sessions.filter((s) =>
-      ["creating", "generating", "ingested"].includes(s.status)
-    ).length,
+    total: Object.values(statusCounts).reduce((sum, n) => sum + n, 0),
+    active: countOf(["generated", "ready", "packet_sent", "feedback_received", "updated"]),
+    completed: countOf(["completed"]),
+    generating: countOf(["creating", "generating", "ingested"]),
   };
 
   if (loading) {
@@ -140,7 +156,7 @@ function Dashboard() {
           <div className="card-header">
             <h2>Interview Sessions</h2>
             <span style={{ fontSize: 13, color: "var(--tamu-gray-500)" }}>
-              {sessions.length} total
+              {nextToken ? `${sessions.length} of ${stats.total} shown` : `${stats.total} total`}
             </span>
           </div>
           <div>
@@ -199,6 +215,13 @@ function Dashboard() {
               );
             })}
           </div>
+          {nextToken && (
+            <div style={{ padding: "16px 24px", textAlign: "center" }}>
+              <button className="btn btn-secondary" onClick={loadMoreSessions} disabled={loadingMore}>
+                {loadingMore ? "Loading..." : "Load more sessions"}
+              </button>
+            </div>
+          )}
         </div>
       )}
     </div>
@@ -24,6 +24,7 @@ function SessionDetail() {
   const { sessionId } = useParams();
   const [session, setSession] = useState(null);
   const [brief, setBrief] = useState(null);
+  const [briefPartial, setBriefPartial] = useState(false);
   const [packet, setPacket] = useState(null);
   const [profile, setProfile] = useState(null);
   const [questions, setQuestions] = useState(null);
@@ -40,6 +41,7 @@ function SessionDetail() {
       const data = await api.getSession(sessionId);
       setSession(data.session);
       setBrief(data.brief);
+      setBriefPartial(Boolean(data.briefPartial));
       setPacket(data.packet);
       setProfile(data.profile);
       setQuestions(data.questions);
@@ -89,7 +91,8 @@ function SessionDetail() {
     }
   }
 
-  if (loading) {
+  // Polls while generating refresh in place, so only the first load blanks the page
+  if (loading && !session) {
     return (
       <div className="loading-overlay">
         <div className="spinner" />
@@ -228,7 +231,7 @@ function SessionDetail() {
         </div>
       </div>
 
-      {isGenerating && (
+      {isGenerating && !(briefPartial && brief) && (
         <div className="card mb-4">
           <div className="card-body loading-overlay" style={{ padding: 40 }}>
             <div className="spinner" />
@@ -241,6 +244,20 @@ function SessionDetail() {
         </div>
       )}
 
+      {isGenerating && briefPartial && brief && (
+        <>
+          <div className="status-bar info mb-4">
+            <span className="spinner" />
+            Generating the brief. Sections appear here as they are written.
+          </div>
+          <div className="card">
+            <div className="card-body">
+              <BriefViewer brief={brief} corrections={corrections} />
+            </div>
+          </div>
+        </>
+      )}
+
       {briefReady && (
         <>
           <div style={{ display: "flex", gap: 2, marginBottom: -1, position: "relative", zIndex: 1 }}>
@@ -33,7 +33,12 @@ async function apiRequest(method, path, body = null) {
 export const api = {
   createSession: (data) => apiRequest("POST", "/sessions", data),
 
-  listSessions: () => apiRequest("GET", "/sessions"),
+  listSessions: (params = {}) => {
+    const query = new URLSearchParams(
+      Object.entries(params).filter(([, value]) => value !== undefined && value !== null)
+    ).toString();
+    return apiRequest("GET", query ? `/sessions?${query}` : "/sessions");
+  },
 
   getSession: (sessionId) => apiRequest("GET", `/sessions/${sessionId}`),
 
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Compare chunking throughput of ingest_sources.chunk_documents with the word-window
+chunk_text it replaced, on synthetic prose (or on text files passed as arguments):
+    python scripts/chunk_benchmark.py [--mb 20] [FILE ...]
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import importlib.util
+
+ROOT = os.path.join(os.path.dirname(__file__), "..", "backend")
+sys.path.insert(0, os.path.join(ROOT, "layers", "shared", "python"))
+# The handler module creates boto3 clients and reads table names at import time; no AWS call is made
+os.environ.setdefault("AWS_DEFAULT_REGION", "us-east-1")
+for name in ("INTERVIEWS_TABLE", "USERS_TABLE", "AUDIT_TABLE", "INSIGHTS_TABLE", "CONSENT_TABLE"):
+    os.environ.setdefault(name, "benchmark")
+
+spec = importlib.util.spec_from_file_location("ingest_sources_app", os.path.join(ROOT, "functions", "ingest_sources", "app.py"))
+ingest = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(ingest)
+
+
+def chunk_text(text, chunk_size=1500, overlap=200):
+    """The word-count chunker chunk_documents replaced, kept here as the baseline."""
+    words = text.split()
+    chunks = []
+    for i in range(0, len(words), chunk_size - overlap):
+        chunk = " ".join(words[i : i + chunk_size])
+        if chunk.strip():
+            chunks.append(chunk)
+    return chunks
+
+
+def synthetic_documents(total_mb, doc_kb=400, seed=7):
+    rng = random.Random(seed)
+    vocab = [
+        "".join(rng.choice("abcdefghijklmnopqrstuvwxyz") for _ in range(rng.randint(2, 11)))
+        for _ in range(5000)
+    ]
+    docs = []
+    size = 0
+    while size < total_mb * 1024 * 1024:
+        paragraphs = []
+        doc_size = 0
+        while doc_size < doc_kb * 1024:
+            sentences = [
+                " ".join(rng.choice(vocab) for _ in range(rng.randint(6, 30))).capitalize() + rng.choice(".!?")
+                for _ in range(rng.randint(2, 8))
+            ]
+            paragraph = " ".join(sentences)
+            paragraphs.append(paragraph)
+            doc_size += len(paragraph) + 2
+        docs.append({"text": "\n\n".join(paragraphs), "source": f"https://example.com/{len(docs)}"})
+        size += doc_size
+    return docs
+
+
+def best_of(fn, runs):
+    best = None
+    for _ in range(runs):
+        started = time.perf_counter()
+        result = fn()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--mb", type=float, default=20)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("files", nargs="*")
+    args = parser.parse_args()
+
+    if args.files:
+        docs = []
+        for path in args.files:
+            with open(path, encoding="utf-8", errors="ignore") as f:
+                docs.append({"text": f.read(), "source": path})
+    else:
+        docs = synthetic_documents(args.mb)
+    mb = sum(len(d["text"]) for d in docs) / (1024 * 1024)
+
+    old_s, old_chunks = best_of(lambda: [c for d in docs for c in chunk_text(d["text"])], args.runs)
+    new_s, new_chunks = best_of(lambda: ingest.chunk_documents(docs), args.runs)
+
+    print(f"{len(docs)} documents, {mb:.1f} MB")
+    print(f"{'chunker':18} {'MB/s':>8} {'chunks':>8} {'max tokens':>11}")
+    print(f"{'chunk_text':18} {mb / old_s:>8.1f} {len(old_chunks):>8} {max(ingest.estimate_tokens(c) for c in old_chunks):>11}")
+    print(f"{'chunk_documents':18} {mb / new_s:>8.1f} {len(new_chunks):>8} {max(c['tokens'] for c in new_chunks):>11}")
+
+
+if __name__ == "__main__":
+    main()
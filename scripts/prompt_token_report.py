@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Report input tokens saved by the compact prompt encoding, per prompt template.
+Compares json.dumps(indent=2) with shared.prompt_context.encode_context for the data each
+generate_* prompt embeds. Pass a real session's artifacts (briefs/{session_id}/v1/):
+    python scripts/prompt_token_report.py company_profile.json questions.json
+By default the figures are character-based estimates (len / 3.5), which overstate the saving:
+the indentation they count tokenizes cheaply. With --model-id, each text is counted by
+Bedrock's CountTokens API for that model instead (needs AWS credentials and model access):
+    python scripts/prompt_token_report.py company_profile.json questions.json \
+        --model-id anthropic.claude-3-5-sonnet-20241022-v2:0
+"""
+import os
+import json
+import argparse
+import importlib.util
+
+SHARED_DIR = os.path.join(os.path.dirname(__file__), "..", "backend", "layers", "shared", "python", "shared")
+
+
+def load_shared_module(name):
+    # Load the file alone: importing the shared package creates boto3 clients, which fails offline without a region
+    spec = importlib.util.spec_from_file_location(f"shared_{name}", os.path.join(SHARED_DIR, f"{name}.py"))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+encode_context = load_shared_module("prompt_context").encode_context
+estimate_tokens = load_shared_module("tokens").estimate_tokens
+
+TEMPLATES = {
+    "generate_questions": ["profile"],
+    "repair_questions": ["questions"],
+    "generate_interviewer_brief": ["profile", "questions"],
+    "generate_interviewee_packet": ["profile", "questions"],
+    "generate_post_call_synthesis": ["profile"],
+}
+
+
+def bedrock_token_counter(model_id):
+    """count(text) using Bedrock CountTokens; each count includes the same small message overhead."""
+    import boto3
+
+    client = boto3.client("bedrock-runtime")
+
+    def count(text):
+        response = client.count_tokens(
+            modelId=model_id,
+            input={"converse": {"messages": [{"role": "user", "content": [{"text": text}]}]}},
+        )
+        return response["inputTokens"]
+
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Input tokens saved by the compact prompt encoding")
+    parser.add_argument("profile_json")
+    parser.add_argument("questions_json")
+    parser.add_argument("--model-id", help="count tokens with Bedrock CountTokens for this model")
+    args = parser.parse_args()
+    with open(args.profile_json) as f:
+        profile = json.load(f)
+    with open(args.questions_json) as f:
+        questions = json.load(f)
+    samples = {"profile": profile, "questions": questions.get("questions", questions)}
+
+    if args.model_id:
+        count_tokens = bedrock_token_counter(args.model_id)
+        print(f"Token counts from Bedrock CountTokens for {args.model_id}")
+    else:
+        count_tokens = estimate_tokens
+        print("Character-based token estimates (len / 3.5); pass --model-id for real counts")
+
+    total_before = total_after = 0
+    print(f"{'template':32} {'before':>8} {'after':>8} {'saved':>7}")
+    for stage, names in TEMPLATES.items():
+        embedded = {n: samples[n] for n in names}
+        if stage == "generate_interviewee_packet":
+            embedded["questions"] = samples["questions"][:6]  # the packet only embeds the question menu
+        before = sum(count_tokens(json.dumps(v, indent=2)) for v in embedded.values())
+        after = sum(count_tokens(encode_context(v, stage, n)) for n, v in embedded.items())
+        total_before += before
+        total_after += after
+        print(f"{stage:32} {before:>8} {after:>8} {1 - after / before:>7.0%}")
+    print(f"{'total':32} {total_before:>8} {total_after:>8} {1 - total_after / total_before:>7.0%}")
+
+
+if __name__ == "__main__":
+    main()